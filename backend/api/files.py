@@ -118,6 +118,7 @@ async def reprocess_file(
                 self.content_type = "image/jpeg" if filename.lower().endswith(('.jpg', '.jpeg')) else "application/pdf"
                 self._content = content
                 self._file = BytesIO(content)
+                self.file = self._file
             
             async def read(self, size: int = -1):
                 return self._file.read(size)
@@ -1,6 +1,7 @@
 """
 OCR text extraction endpoint.
 """
+import asyncio
 from fastapi import APIRouter, Depends, HTTPException
 from app.dependencies import get_database
 from app.services.database_service import DatabaseService
@@ -78,7 +79,8 @@ async def extract_text_ocr(
             
             for i, page_path in enumerate(processed_pages, start=1):
                 logger.info(f"OCR processing page {i}/{len(processed_pages)}")
-                text, confidence, _ = ocr_engine.extract_text(
+                text, confidence, _ = await asyncio.to_thread(
+                    ocr_engine.extract_text,
                     page_path,
                     use_easyocr=request.use_easyocr
                 )
@@ -96,7 +98,8 @@ async def extract_text_ocr(
                 
                 for i, page_path in enumerate(processed_pages, start=1):
                     logger.info(f"TrOCR processing page {i}/{len(processed_pages)}")
-                    text, confidence, _ = ocr_engine.extract_text(
+                    text, confidence, _ = await asyncio.to_thread(
+                        ocr_engine.extract_text,
                         page_path,
                         use_trocr=True
                     )
@@ -128,7 +131,8 @@ async def extract_text_ocr(
             use_trocr = getattr(request, 'use_trocr', False)
             
             ocr_engine = OCREngine()
-            combined_text, avg_confidence, ocr_details = ocr_engine.extract_text(
+            combined_text, avg_confidence, ocr_details = await asyncio.to_thread(
+                ocr_engine.extract_text,
                 job['processed_image_path'],
                 use_easyocr=request.use_easyocr,
                 use_trocr=use_trocr
@@ -137,7 +141,8 @@ async def extract_text_ocr(
             # Auto-retry with TrOCR if confidence is low
             if avg_confidence < 80 and not use_trocr:
                 logger.info("Low confidence detected, retrying with TrOCR...")
-                combined_text, avg_confidence, ocr_details = ocr_engine.extract_text(
+                combined_text, avg_confidence, ocr_details = await asyncio.to_thread(
+                    ocr_engine.extract_text,
                     job['processed_image_path'],
                     use_trocr=True
                 )
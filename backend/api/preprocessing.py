@@ -1,9 +1,11 @@
 """
 Image preprocessing endpoint.
 """
+import asyncio
 from fastapi import APIRouter, Depends, HTTPException
-from app.dependencies import get_database
+from app.dependencies import get_database, get_storage
 from app.services.database_service import DatabaseService
+from app.services.storage_service import StorageService
 from app.core.image_preprocessor import ImagePreprocessor
 from app.models.schemas import PreprocessingRequest
 from app.models.enums import WorkflowState
@@ -18,7 +20,8 @@ router = APIRouter()
 @router.post("/")
 async def preprocess_image(
     request: PreprocessingRequest,
-    db: DatabaseService = Depends(get_database)
+    db: DatabaseService = Depends(get_database),
+    storage: StorageService = Depends(get_storage)
 ):
     """
     Preprocess uploaded image for OCR.
@@ -68,7 +71,8 @@ async def preprocess_image(
             
             # Split PDF to pages
             pages_dir = os.path.join('uploads', f'{request.job_id}_pages')
-            page_paths = processor.split_pdf_to_pages(original_path, pages_dir)
+            page_paths = await asyncio.to_thread(processor.split_pdf_to_pages, original_path, pages_dir)
+            await storage.record_job_files(request.job_id, pages_dir)
             
             logger.info(f"PDF split into {len(page_paths)} pages")
             
@@ -77,7 +81,7 @@ async def preprocess_image(
             for i, page_path in enumerate(page_paths, start=1):
                 processed_path = page_path.replace('.jpg', '_processed.jpg')
                 preprocessor = ImagePreprocessor()
-                preprocessor.preprocess(page_path, processed_path)
+                await asyncio.to_thread(preprocessor.preprocess, page_path, processed_path)
                 processed_pages.append(processed_path)
                 logger.debug(f"Preprocessed page {i}/{len(page_paths)}")
             
@@ -103,10 +107,12 @@ async def preprocess_image(
             logger.info("Detected image - Processing as single page")
             
             preprocessor = ImagePreprocessor()
-            preprocessing_details = preprocessor.preprocess(
+            preprocessing_details = await asyncio.to_thread(
+                preprocessor.preprocess,
                 original_path,
                 job['processed_image_path']
             )
+            await storage.record_job_files(request.job_id, job['processed_image_path'])
             
             preprocessing_details['total_pages'] = 1
             preprocessing_details['processing_type'] = 'single_image'
@@ -1,6 +1,7 @@
 """
 Teacher reference document upload and management endpoint.
 """
+import asyncio
 from fastapi import APIRouter, UploadFile, File, Form, Depends, HTTPException
 from datetime import datetime, timezone
 from typing import Optional
@@ -135,7 +136,8 @@ async def upload_reference(
 @router.post("/process/{reference_id}")
 async def process_reference(
     reference_id: str,
-    db: DatabaseService = Depends(get_database)
+    db: DatabaseService = Depends(get_database),
+    storage: StorageService = Depends(get_storage)
 ):
     """
     Process reference document: OCR + Parse answers.
@@ -166,7 +168,7 @@ async def process_reference(
             from app.services.multipage_processor import MultiPageProcessor
             
             processor = MultiPageProcessor()
-            result = processor.process_all_pages(
+            result = await processor.process_all_pages(
                 original_path,
                 reference_id,
                 reference['total_marks']
@@ -190,15 +192,18 @@ async def process_reference(
             
             # Step 1: Preprocess
             preprocessor = ImagePreprocessor()
-            preprocessor.preprocess(
+            await asyncio.to_thread(
+                preprocessor.preprocess,
                 original_path,
                 reference['processed_reference_path']
             )
+            await storage.record_job_files(reference_id, reference['processed_reference_path'])
             logger.info(f"Reference preprocessed: {reference_id}")
             
             # Step 2: OCR Extract
             ocr_engine = OCREngine()
-            text, confidence, _ = ocr_engine.extract_text(
+            text, confidence, _ = await asyncio.to_thread(
+                ocr_engine.extract_text,
                 reference['processed_reference_path']
             )
             logger.info(f"Reference OCR completed: {reference_id}, Confidence: {confidence}%")
@@ -3,8 +3,9 @@ Report generation and delivery endpoint.
 """
 from fastapi import APIRouter, Depends, HTTPException
 from fastapi.responses import FileResponse
-from app.dependencies import get_database
+from app.dependencies import get_database, get_storage
 from app.services.database_service import DatabaseService
+from app.services.storage_service import StorageService
 from app.core.report_generator import ReportGenerator
 from app.models.schemas import ReportRequest
 from app.models.enums import WorkflowState
@@ -19,7 +20,8 @@ router = APIRouter()
 @router.post("/generate")
 async def generate_report(
     request: ReportRequest,
-    db: DatabaseService = Depends(get_database)
+    db: DatabaseService = Depends(get_database),
+    storage: StorageService = Depends(get_storage)
 ):
     """
     Generate final assessment report.
@@ -70,6 +72,7 @@ async def generate_report(
             report_path = report_gen.generate_json_report(job, json_path)
         else:
             raise HTTPException(status_code=400, detail=f"Unsupported format: {request.format}")
+        await storage.record_job_files(request.job_id, report_path)
         
         # Update job with completion
         await db.update_job(request.job_id, {
@@ -174,7 +177,7 @@ async def get_report_status(
         Report status information
     """
     try:
-        job = await db.get_job(job_id)
+        job = await db.get_job_status(job_id)
         if not job:
             raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
         
@@ -29,12 +29,8 @@ async def get_my_references(
     try:
         logger.info(f"Fetching references for teacher: {current_teacher.email}")
         
-        # Get all references by this teacher
-        references = await db.get_references_by_teacher(current_teacher.email)
-        
-        # Add submission count to each reference
-        for ref in references:
-            ref['submission_count'] = await db.count_submissions_for_reference(ref['reference_id'])
+        # Get all references by this teacher with submission counts
+        references = await db.get_teacher_dashboard(current_teacher.email)
         
         return build_response(
             status="success",
@@ -78,12 +74,9 @@ async def get_submissions_for_reference(
                 detail="You can only view submissions for your own exams"
             )
         
-        # Get all submissions for this reference
-        submissions = await db.get_submissions_by_reference(reference_id)
-        
-        # Format response with essential info
+        # Stream submissions for this reference and format essential info
         formatted_submissions = []
-        for sub in submissions:
+        async for sub in db.iter_submissions_by_reference(reference_id):
             percentage = sub.get('percentage', 0)
     
             # Calculate grade if missing or N/A
@@ -227,10 +220,21 @@ async def get_class_statistics(
         if reference.get('teacher_email') != current_teacher.email:
             raise HTTPException(status_code=403, detail="Access denied")
         
-        # Get all submissions
-        submissions = await db.get_submissions_by_reference(reference_id)
+        # Stream submissions, keeping only scores and grades
+        scores = []
+        grades = []
+        async for s in db.iter_submissions_by_reference(reference_id):
+            percentage = s.get('percentage', 0)
+            grade = s.get('grade', 'N/A')
+            
+            # Calculate if missing or invalid
+            if not grade or grade == 'N/A':
+                grade = get_grade_from_percentage(percentage)
+            
+            scores.append(percentage)
+            grades.append(grade)
         
-        if not submissions:
+        if not scores:
             return build_response(
                 status="success",
                 message="No submissions yet",
@@ -248,18 +252,6 @@ async def get_class_statistics(
             )
         
         # Calculate statistics
-        scores = [s.get('percentage', 0) for s in submissions]
-        grades = []
-        for s in submissions:
-            percentage = s.get('percentage', 0)
-            grade = s.get('grade', 'N/A')
-            
-            # Calculate if missing or invalid
-            if not grade or grade == 'N/A':
-                grade = get_grade_from_percentage(percentage)
-            
-            grades.append(grade)
-        
         # Grade distribution
         grade_dist = {
             "A": grades.count("A"),
@@ -272,7 +264,7 @@ async def get_class_statistics(
             grade_dist[grade] = grades.count(grade)
         
         statistics = {
-            "total_students": len(submissions),
+            "total_students": len(scores),
             "average_score": round(sum(scores) / len(scores), 2),
             "highest_score": max(scores),
             "lowest_score": min(scores),
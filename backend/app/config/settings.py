@@ -17,10 +17,16 @@ class Settings(BaseSettings):
     debug: bool = Field(default=False, env="DEBUG")
     host: str = Field(default="0.0.0.0", env="HOST")
     port: int = Field(default=8000, env="PORT")
+    # Server worker processes sharing this host (same variable uvicorn/gunicorn read)
+    web_concurrency: int = Field(default=1, env="WEB_CONCURRENCY")
     
     # MongoDB
     mongodb_url: str = Field(..., env="MONGODB_URL")
     mongodb_db_name: str = Field(default="agentic_ai_db", env="MONGODB_DB_NAME")
+    mongodb_max_pool_size: int = Field(default=50, env="MONGODB_MAX_POOL_SIZE")
+    mongodb_min_pool_size: int = Field(default=5, env="MONGODB_MIN_POOL_SIZE")
+    # Days after creation before jobs are auto-deleted; 0 disables the TTL index
+    job_ttl_days: int = Field(default=0, env="JOB_TTL_DAYS")
     
     # # OpenAI
     # openai_api_key: str = Field(..., env="OPENAI_API_KEY")
@@ -54,6 +60,9 @@ class Settings(BaseSettings):
     # Tesseract
     tesseract_cmd: str = Field(default="/usr/bin/tesseract", env="TESSERACT_CMD")
     
+    # TrOCR
+    trocr_preload: bool = Field(default=False, env="TROCR_PRELOAD")
+    
     # SMTP
     smtp_host: str = Field(default="smtp.gmail.com", env="SMTP_HOST")
     smtp_port: int = Field(default=587, env="SMTP_PORT")
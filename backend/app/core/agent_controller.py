@@ -1,6 +1,7 @@
 """
 Agent Controller - Orchestrates multiple specialized AI agents.
 """
+import asyncio
 from typing import Dict, Any, Optional
 from enum import Enum
 from app.config.logging_config import get_logger
@@ -110,6 +111,9 @@ class AgentController:
             # Execute with automatic async detection
             if inspect.iscoroutinefunction(executor):
                 result = await executor(task_data)
+            elif agent_type == AgentType.VISION:
+                # OCR is CPU-bound; keep it off the event loop
+                result = await asyncio.to_thread(executor, task_data)
             else:
                 result = executor(task_data)
             
@@ -55,31 +55,50 @@ class ImagePreprocessor:
             if image is None:
                 raise ValueError(f"Could not read image from path: {image_path}")
             
-            original_shape = image.shape
-            logger.debug(f"Original image shape: {original_shape}")
-
-            if enhance_for_handwriting:
-                # Enhanced preprocessing for handwritten text
-                image = self._enhance_for_handwriting(image)
-                steps = ["grayscale", "denoise", "contrast_enhancement", "sharpening"]
-            else:
-                # Basic preprocessing
-                steps = ["validation", "copy"]
+            image, details = self.preprocess_array(image, enhance_for_handwriting)
 
             # Just save as-is (or optionally convert to grayscale)
             cv2.imwrite(output_path, image)
             
             logger.info(f"Image validated and saved: {output_path}")
             
-            return {
-                "original_shape": original_shape,
-                "preprocessing_steps": steps,
-                "enhanced_for_handwriting": enhance_for_handwriting
-            }
+            return details
         
         except Exception as e:
             logger.error(f"Preprocessing failed: {str(e)}", exc_info=True)
             raise Exception(f"Image preprocessing failed: {str(e)}")
+
+    def preprocess_array(
+        self,
+        image: np.ndarray,
+        enhance_for_handwriting: bool = False
+    ) -> Tuple[np.ndarray, Dict[str, Any]]:
+        """
+        Preprocess an in-memory image without touching the filesystem.
+        
+        Args:
+            image: Input image array (BGR or grayscale)
+            enhance_for_handwriting: Apply handwriting enhancement pipeline
+            
+        Returns:
+            Tuple of (processed image, preprocessing details)
+        """
+        original_shape = image.shape
+        logger.debug(f"Original image shape: {original_shape}")
+
+        if enhance_for_handwriting:
+            # Enhanced preprocessing for handwritten text
+            image = self._enhance_for_handwriting(image)
+            steps = ["grayscale", "denoise", "contrast_enhancement", "sharpening"]
+        else:
+            # Basic preprocessing
+            steps = ["validation", "copy"]
+
+        return image, {
+            "original_shape": original_shape,
+            "preprocessing_steps": steps,
+            "enhanced_for_handwriting": enhance_for_handwriting
+        }
         
     def _enhance_for_handwriting(self, image: np.ndarray) -> np.ndarray:
         """
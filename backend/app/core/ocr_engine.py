@@ -4,11 +4,13 @@ OCR extraction engine supporting Tesseract and EasyOCR.
 
 import pytesseract
 import easyocr
-from typing import List, Dict, Any, Tuple
+from typing import List, Dict, Any, Tuple, Union
 import cv2
+import numpy as np
 from app.config.logging_config import get_logger
 from app.config.settings import settings
 from app.config.constants import OCR_MIN_CONFIDENCE
+from app.core.utils import describe_image_source
 
 logger = get_logger(__name__)
 
@@ -23,12 +25,12 @@ class OCREngine:
         self.easyocr_reader = None
         logger.info("OCREngine initialized")
 
-    def extract_text_tesseract(self, image_path: str) -> Tuple[str, float, Dict[str, Any]]:
+    def extract_text_tesseract(self, image_path: Union[str, np.ndarray]) -> Tuple[str, float, Dict[str, Any]]:
         """
         Extract text using Tesseract OCR.
         
         Args:
-            image_path: Path to image file
+            image_path: Path to image file or in-memory image array
             
         Returns:
             Tuple of (extracted_text, confidence, details)
@@ -37,10 +39,13 @@ class OCREngine:
             Exception: If OCR extraction fails
         """
         try:
-            logger.info(f"Starting Tesseract OCR for: {image_path}")
+            logger.info(f"Starting Tesseract OCR for: {describe_image_source(image_path)}")
 
             # Read Image
-            image = cv2.imread(image_path)
+            if isinstance(image_path, np.ndarray):
+                image = image_path
+            else:
+                image = cv2.imread(image_path)
             if image is None:
                 raise ValueError(f"Could not read image from path: {image_path}")
             
@@ -76,12 +81,12 @@ class OCREngine:
             logger.error(f"Tesseract OCR failed: {str(e)}", exc_info=True)
             raise Exception(f"Tesseract OCR extraction failed: {str(e)}")
         
-    def extract_text_easyocr(self, image_path: str) -> Tuple[str, float, Dict[str, Any]]:
+    def extract_text_easyocr(self, image_path: Union[str, np.ndarray]) -> Tuple[str, float, Dict[str, Any]]:
         """
         Extract text using EasyOCR.
         
         Args:
-            image_path: Path to image file
+            image_path: Path to image file or in-memory image array
             
         Returns:
             Tuple of (extracted_text, confidence, details)
@@ -90,7 +95,7 @@ class OCREngine:
             Exception: If OCR extraction fails
         """
         try:
-            logger.info(f"Starting EasyOCR for: {image_path}")
+            logger.info(f"Starting EasyOCR for: {describe_image_source(image_path)}")
             
             # Initialize EasyOCR reader if not already done
             if self.easyocr_reader is None:
@@ -130,28 +135,24 @@ class OCREngine:
             logger.error(f"EasyOCR failed: {str(e)}", exc_info=True)
             raise Exception(f"EasyOCR extraction failed: {str(e)}")
         
-    def extract_text_trocr(self, image_path: str) -> Tuple[str, float, Dict[str, Any]]:
+    def extract_text_trocr(self, image_path: Union[str, np.ndarray]) -> Tuple[str, float, Dict[str, Any]]:
         """
         Extract text using TrOCR (optimized for handwritten text).
         
         Args:
-            image_path: Path to image file
+            image_path: Path to image file or in-memory image array
             
         Returns:
             Tuple of (extracted_text, confidence, details)
         """
         try:
-            logger.info(f"Starting TrOCR for: {image_path}")
+            logger.info(f"Starting TrOCR for: {describe_image_source(image_path)}")
             
-            # Initialize TrOCR engine if not already done
-            if self.trocr_engine is None:
-                logger.debug("Initializing TrOCR engine...")
-                from app.core.trocr_engine import TrOCREngine
-                self.trocr_engine = TrOCREngine()
-                logger.debug("TrOCR engine initialized")
+            # Shared engine; the model is loaded once per process
+            from app.core.trocr_engine import get_trocr_engine
             
             # Extract text
-            text, confidence, details = self.trocr_engine.extract_text(image_path)
+            text, confidence, details = get_trocr_engine().extract_text(image_path)
             
             logger.info(f"TrOCR completed: {details['lines_recognized']} lines recognized")
             
@@ -161,12 +162,12 @@ class OCREngine:
             logger.error(f"TrOCR failed: {str(e)}", exc_info=True)
             raise Exception(f"TrOCR extraction failed: {str(e)}")
         
-    def extract_text(self, image_path: str, use_easyocr: bool = False, use_trocr: bool = False) -> Tuple[str, float, Dict[str, Any]]:
+    def extract_text(self, image_path: Union[str, np.ndarray], use_easyocr: bool = False, use_trocr: bool = False) -> Tuple[str, float, Dict[str, Any]]:
         """
         Extract text using specified OCR engine.
         
         Args:
-            image_path: Path to image file
+            image_path: Path to image file or in-memory image array
             use_easyocr: Use EasyOCR instead of Tesseract
             
         Returns:
@@ -2,16 +2,40 @@
 TrOCR-based OCR engine for handwritten text recognition.
 Handles multi-line documents by detecting and processing individual lines.
 """
+import threading
 import cv2
 import numpy as np
 from PIL import Image
-from typing import List, Dict, Any, Tuple
+from typing import List, Dict, Any, Tuple, Union, Optional
 from transformers import TrOCRProcessor, VisionEncoderDecoderModel
 import torch
 from app.config.logging_config import get_logger    
+from app.core.utils import describe_image_source
 
 logger = get_logger(__name__)
 
+# Process-wide engine instance; the model weights are loaded only once
+_engine: Optional["TrOCREngine"] = None
+_engine_lock = threading.Lock()
+
+# Line crops recognized per model.generate call
+TROCR_BATCH_SIZE = 8
+
+
+def get_trocr_engine() -> "TrOCREngine":
+    """
+    Get the shared TrOCR engine, loading the model on first use.
+    
+    Returns:
+        TrOCREngine instance
+    """
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = TrOCREngine()
+    return _engine
+
 
 class TrOCREngine:
     """
@@ -42,26 +66,32 @@ class TrOCREngine:
             logger.error(f"Failed to initialize TrOCR: {str(e)}")
             raise
     
-    def detect_text_lines(self, image_path: str) -> List[np.ndarray]:
+    def detect_text_lines(self, image_path: Union[str, np.ndarray]) -> List[np.ndarray]:
         """
         Detect and extract individual text lines from image.
         
         Args:
-            image_path: Path to input image
+            image_path: Path to input image or in-memory image array
             
         Returns:
             List of cropped line images
         """
         try:
-            logger.info(f"Detecting text lines in: {image_path}")
+            logger.info(f"Detecting text lines in: {describe_image_source(image_path)}")
             
             # Read image
-            image = cv2.imread(image_path)
+            if isinstance(image_path, np.ndarray):
+                image = image_path
+            else:
+                image = cv2.imread(image_path)
             if image is None:
                 raise ValueError(f"Could not read image: {image_path}")
             
             # Convert to grayscale
-            gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+            if len(image.shape) == 3:
+                gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+            else:
+                gray = image
             
             # Apply binary threshold
             _, binary = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
@@ -119,44 +149,65 @@ class TrOCREngine:
         Returns:
             Recognized text string
         """
-        try:
-            # Convert OpenCV image (BGR) to PIL Image (RGB)
-            if len(line_image.shape) == 3:
-                line_image = cv2.cvtColor(line_image, cv2.COLOR_BGR2RGB)
-            
-            pil_image = Image.fromarray(line_image)
-            
-            # Process image
-            pixel_values = self.processor(
-                images=pil_image,
-                return_tensors="pt"
-            ).pixel_values.to(self.device)
-            
-            # Generate text
-            with torch.no_grad():
-                generated_ids = self.model.generate(pixel_values)
-            
-            # Decode text
-            text = self.processor.batch_decode(generated_ids, skip_special_tokens=True)[0]
-            
-            return text.strip()
+        return self.recognize_lines([line_image])[0]
+    
+    def recognize_lines(self, line_images: List[np.ndarray], batch_size: int = TROCR_BATCH_SIZE) -> List[str]:
+        """
+        Recognize text in many line images with batched TrOCR inference.
+        
+        Args:
+            line_images: NumPy arrays of line images (OpenCV format)
+            batch_size: Number of lines per model.generate call
             
-        except Exception as e:
-            logger.error(f"Line recognition failed: {str(e)}")
-            return ""
+        Returns:
+            Recognized text strings, one per input line
+        """
+        texts = []
+        for start in range(0, len(line_images), batch_size):
+            batch = line_images[start:start + batch_size]
+            try:
+                # Convert OpenCV images (BGR or grayscale) to PIL Images (RGB)
+                pil_images = [
+                    Image.fromarray(cv2.cvtColor(
+                        line_image,
+                        cv2.COLOR_BGR2RGB if len(line_image.shape) == 3 else cv2.COLOR_GRAY2RGB
+                    ))
+                    for line_image in batch
+                ]
+                
+                # Processor resizes every line to the same size, so they stack into one tensor
+                pixel_values = self.processor(
+                    images=pil_images,
+                    return_tensors="pt"
+                ).pixel_values.to(self.device)
+                
+                # Greedy decoding for the whole batch in one call
+                with torch.no_grad():
+                    generated_ids = self.model.generate(pixel_values, num_beams=1)
+                
+                texts.extend(
+                    text.strip()
+                    for text in self.processor.batch_decode(generated_ids, skip_special_tokens=True)
+                )
+                
+            except Exception as e:
+                logger.error(f"Batch line recognition failed: {str(e)}")
+                texts.extend([""] * len(batch))
+        
+        return texts
     
-    def extract_text(self, image_path: str) -> Tuple[str, float, Dict[str, Any]]:
+    def extract_text(self, image_path: Union[str, np.ndarray]) -> Tuple[str, float, Dict[str, Any]]:
         """
         Extract text from multi-line handwritten document.
         
         Args:
-            image_path: Path to input image
+            image_path: Path to input image or in-memory image array
             
         Returns:
             Tuple of (extracted_text, confidence, details)
         """
         try:
-            logger.info(f"Starting TrOCR text extraction: {image_path}")
+            logger.info(f"Starting TrOCR text extraction: {describe_image_source(image_path)}")
             
             # Detect text lines
             line_images = self.detect_text_lines(image_path)
@@ -169,36 +220,90 @@ class TrOCREngine:
                     "text_length": 0
                 }
             
-            # Recognize each line
-            extracted_lines = []
-            for i, line_img in enumerate(line_images):
-                text = self.recognize_line(line_img)
-                if text:
-                    extracted_lines.append(text)
-                    logger.debug(f"Line {i+1}: {text[:50]}...")
+            # Recognize all lines in batches
+            full_text, confidence, details = self._combine_lines(self.recognize_lines(line_images))
             
-            # Combine lines
-            full_text = '\n'.join(extracted_lines)
+            logger.info(f"TrOCR extraction completed: {details['lines_recognized']} lines, {len(full_text)} characters")
             
-            # Calculate confidence (simplified - TrOCR doesn't provide confidence scores)
-            # We estimate based on successful line detection
-            confidence = (len(extracted_lines) / len(line_images) * 100) if line_images else 0
+            return full_text, confidence, details
             
-            # Prepare details
-            details = {
-                "engine": "trocr",
-                "model": "microsoft/trocr-base-handwritten",
-                "lines_detected": len(line_images),
-                "lines_recognized": len(extracted_lines),
-                "text_length": len(full_text),
-                "word_count": len(full_text.split()),
-                "average_confidence": round(confidence, 2)
-            }
+        except Exception as e:
+            logger.error(f"TrOCR extraction failed: {str(e)}", exc_info=True)
+            raise Exception(f"TrOCR extraction failed: {str(e)}")
+    
+    def extract_text_batch(
+        self,
+        images: List[Union[str, np.ndarray]],
+        batch_size: int = TROCR_BATCH_SIZE
+    ) -> List[Tuple[str, float, Dict[str, Any]]]:
+        """
+        Extract text from several documents, batching line recognition across all of them.
+        
+        Args:
+            images: Paths to input images or in-memory image arrays
+            batch_size: Number of lines per model.generate call
+            
+        Returns:
+            List of (extracted_text, confidence, details) tuples, one per image
+        """
+        try:
+            logger.info(f"Starting batched TrOCR text extraction for {len(images)} images")
+            
+            # Detect lines on every page, then recognize them together
+            lines_per_image = [self.detect_text_lines(image) for image in images]
+            all_lines = [line for lines in lines_per_image for line in lines]
+            all_texts = self.recognize_lines(all_lines, batch_size)
+            
+            # Split recognized lines back per page
+            results = []
+            offset = 0
+            for lines in lines_per_image:
+                results.append(self._combine_lines(all_texts[offset:offset + len(lines)]))
+                offset += len(lines)
             
-            logger.info(f"TrOCR extraction completed: {len(extracted_lines)} lines, {len(full_text)} characters")
+            logger.info(f"Batched TrOCR extraction completed: {len(all_lines)} lines across {len(images)} images")
             
-            return full_text.strip(), confidence, details
+            return results
             
         except Exception as e:
-            logger.error(f"TrOCR extraction failed: {str(e)}", exc_info=True)
-            raise Exception(f"TrOCR extraction failed: {str(e)}")
\ No newline at end of file
+            logger.error(f"Batched TrOCR extraction failed: {str(e)}", exc_info=True)
+            raise Exception(f"Batched TrOCR extraction failed: {str(e)}")
+    
+    def _combine_lines(self, line_texts: List[str]) -> Tuple[str, float, Dict[str, Any]]:
+        """
+        Combine recognized lines into document text with a confidence estimate.
+        
+        Args:
+            line_texts: Recognized text for each detected line
+            
+        Returns:
+            Tuple of (extracted_text, confidence, details)
+        """
+        if not line_texts:
+            return "", 0.0, {
+                "engine": "trocr",
+                "lines_detected": 0,
+                "text_length": 0
+            }
+        
+        extracted_lines = [text for text in line_texts if text]
+        
+        # Combine lines
+        full_text = '\n'.join(extracted_lines)
+        
+        # Calculate confidence (simplified - TrOCR doesn't provide confidence scores)
+        # We estimate based on successful line detection
+        confidence = len(extracted_lines) / len(line_texts) * 100
+        
+        # Prepare details
+        details = {
+            "engine": "trocr",
+            "model": "microsoft/trocr-base-handwritten",
+            "lines_detected": len(line_texts),
+            "lines_recognized": len(extracted_lines),
+            "text_length": len(full_text),
+            "word_count": len(full_text.split()),
+            "average_confidence": round(confidence, 2)
+        }
+        
+        return full_text.strip(), confidence, details
\ No newline at end of file
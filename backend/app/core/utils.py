@@ -1,15 +1,31 @@
 """
 Shared utility functions used across the application.
 """
+import asyncio
+import errno
 import os
 import uuid
 import traceback
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Awaitable, Callable, Tuple, Type, TypeVar
 from datetime import datetime
+from pymongo.errors import ConnectionFailure
 from app.config.logging_config import get_logger
 
 logger = get_logger(__name__)
 
+T = TypeVar("T")
+
+# Attempts made by retry_async; waits between attempts grow as 1s, 2s, 4s, ...
+RETRY_ATTEMPTS = 3
+
+# Failures worth retrying: dropped/failed-over Mongo connections and filesystem hiccups
+TRANSIENT_ERRORS: Tuple[Type[BaseException], ...] = (ConnectionFailure, OSError)
+
+# OSError codes that can clear up on their own; anything else (EACCES, ENOSPC, ...) fails fast
+TRANSIENT_ERRNOS = frozenset({
+    errno.EAGAIN, errno.EINTR, errno.EBUSY, errno.ETIMEDOUT, errno.ECONNRESET
+})
+
 
 def generate_job_id() -> str:
     """
@@ -71,6 +87,24 @@ def validate_file_extension(filename: str, allowed_extensions: list) -> bool:
     return is_valid
 
 
+def describe_image_source(image: Any) -> str:
+    """
+    Describe an image source for log messages.
+    
+    Args:
+        image: Image file path or in-memory image array
+        
+    Returns:
+        The path, or a short description of the array shape
+    """
+    if isinstance(image, str):
+        return image
+    shape = getattr(image, "shape", None)
+    if shape is not None and len(shape) >= 2:
+        return f"<in-memory image {shape[1]}x{shape[0]}>"
+    return "<in-memory image>"
+
+
 def get_trace_info() -> str:
     """
     Get current execution trace information.
@@ -165,4 +199,40 @@ def sanitize_filename(filename: str) -> str:
     sanitized = filename
     for char in unsafe_chars:
         sanitized = sanitized.replace(char, '_')
-    return sanitized
\ No newline at end of file
+    return sanitized
+
+
+async def retry_async(
+    operation: Callable[..., Awaitable[T]],
+    *args: Any,
+    attempts: int = RETRY_ATTEMPTS,
+    retry_on: Tuple[Type[BaseException], ...] = TRANSIENT_ERRORS,
+    **kwargs: Any
+) -> T:
+    """
+    Await an operation, retrying transient failures with exponential backoff.
+    
+    Only use for idempotent operations; other errors propagate immediately.
+    OSErrors are retried only when their errno is in TRANSIENT_ERRNOS.
+    
+    Args:
+        operation: Async callable to run
+        *args: Positional arguments for the operation
+        attempts: Maximum number of attempts
+        retry_on: Exception types that trigger a retry
+        **kwargs: Keyword arguments for the operation
+        
+    Returns:
+        Result of the operation
+    """
+    for attempt in range(attempts):
+        try:
+            return await operation(*args, **kwargs)
+        except retry_on as e:
+            if attempt == attempts - 1:
+                raise
+            if isinstance(e, OSError) and e.errno not in TRANSIENT_ERRNOS:
+                raise
+            delay = 2 ** attempt
+            logger.warning(f"{getattr(operation, '__name__', 'operation')} failed ({str(e)}), retrying in {delay}s")
+            await asyncio.sleep(delay)
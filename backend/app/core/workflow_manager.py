@@ -2,12 +2,12 @@
 Workflow Manager - Orchestrates complete autonomous workflows.
 Multi-agent collaboration coordinator.
 """
+import asyncio
 import os
 from typing import Dict, Any, Optional
 from fastapi import UploadFile
 from app.config.logging_config import get_logger
 from app.core.agent_controller import AgentController, AgentType
-from app.services.database_service import DatabaseService
 from app.services.storage_service import StorageService
 from app.services.reference_service import ReferenceService
 from app.services.multipage_processor import MultiPageProcessor
@@ -63,9 +63,9 @@ class WorkflowManager:
         """
         logger.info(f"Starting autonomous workflow for {student_name}")
         
-        # Initialize services
-        self.db = DatabaseService()
-        await self.db.connect()
+        # Initialize services (shared, already-connected database service)
+        from app.dependencies import get_database
+        self.db = await get_database()
         self.storage = StorageService()
         
         # Generate job ID
@@ -117,7 +117,8 @@ class WorkflowManager:
                 # Try with Tesseract first (faster)
                 processor = MultiPageProcessor(use_trocr=False)
                 pages_dir = os.path.join('uploads', f'{job_id}_pages')
-                page_paths = processor.split_pdf_to_pages(original_path, pages_dir)
+                page_paths = await asyncio.to_thread(processor.split_pdf_to_pages, original_path, pages_dir)
+                await self.storage.record_job_files(job_id, pages_dir)
                 
                 # Preprocess all pages
                 processed_pages = []
@@ -125,7 +126,7 @@ class WorkflowManager:
                     processed_path = page_path.replace('.jpg', '_processed.jpg')
                     from app.core.image_preprocessor import ImagePreprocessor
                     preprocessor = ImagePreprocessor()
-                    preprocessor.preprocess(page_path, processed_path)
+                    await asyncio.to_thread(preprocessor.preprocess, page_path, processed_path)
                     processed_pages.append(processed_path)
                 
                 workflow_result['stages']['preprocessing'] = {
@@ -139,7 +140,8 @@ class WorkflowManager:
                 # Single image preprocessing
                 from app.core.image_preprocessor import ImagePreprocessor
                 preprocessor = ImagePreprocessor()
-                preprocessor.preprocess(original_path, job_data['processed_image_path'])
+                await asyncio.to_thread(preprocessor.preprocess, original_path, job_data['processed_image_path'])
+                await self.storage.record_job_files(job_id, job_data['processed_image_path'])
                 
                 workflow_result['stages']['preprocessing'] = {
                     "status": "success",
@@ -174,7 +176,9 @@ class WorkflowManager:
                 total_confidence = 0
                 
                 for i, page_path in enumerate(image_path_for_ocr, 1):
-                    text, confidence, _ = ocr_engine.extract_text(page_path, use_easyocr=False, use_trocr=False)
+                    text, confidence, _ = await asyncio.to_thread(
+                        ocr_engine.extract_text, page_path, use_easyocr=False, use_trocr=False
+                    )
                     all_text.append(text)
                     total_confidence += confidence
                 
@@ -186,15 +190,15 @@ class WorkflowManager:
                     logger.warning(f"Low OCR confidence ({avg_confidence:.1f}%), retrying with TrOCR for handwriting...")
                     
                     try:
-                        from app.core.trocr_engine import TrOCREngine
-                        trocr_engine = TrOCREngine()
+                        from app.core.trocr_engine import get_trocr_engine
+                        trocr_engine = get_trocr_engine()
                         
                         all_text = []
                         total_confidence = 0
                         
                         for i, page_path in enumerate(image_path_for_ocr, 1):
                             logger.info(f"TrOCR processing page {i}/{len(image_path_for_ocr)}...")
-                            text, confidence, _ = trocr_engine.extract_text(page_path)
+                            text, confidence, _ = await asyncio.to_thread(trocr_engine.extract_text, page_path)
                             all_text.append(text)
                             total_confidence += confidence
                             logger.debug(f"Page {i}: {confidence:.1f}% confidence")
@@ -215,9 +219,10 @@ class WorkflowManager:
                 ocr_engine = OCREngine()
                 
                 # Try Tesseract first
-                extracted_text, avg_confidence, _ = ocr_engine.extract_text(
-                    image_path_for_ocr, 
-                    use_easyocr=False, 
+                extracted_text, avg_confidence, _ = await asyncio.to_thread(
+                    ocr_engine.extract_text,
+                    image_path_for_ocr,
+                    use_easyocr=False,
                     use_trocr=False
                 )
                 
@@ -227,10 +232,12 @@ class WorkflowManager:
                 if avg_confidence < 80:
                     logger.warning(f"Low OCR confidence ({avg_confidence:.1f}%), retrying with TrOCR...")
                     try:
-                        from app.core.trocr_engine import TrOCREngine
-                        trocr_engine = TrOCREngine()
+                        from app.core.trocr_engine import get_trocr_engine
+                        trocr_engine = get_trocr_engine()
                         
-                        extracted_text, avg_confidence, _ = trocr_engine.extract_text(image_path_for_ocr)
+                        extracted_text, avg_confidence, _ = await asyncio.to_thread(
+                            trocr_engine.extract_text, image_path_for_ocr
+                        )
                         logger.info(f"TrOCR completed with improved confidence: {avg_confidence:.1f}%")
                         
                     except Exception as e:
@@ -408,6 +415,8 @@ class WorkflowManager:
                 }
             )
             
+            await self.storage.record_job_files(job_id, report_path)
+            
             workflow_result['stages']['report'] = {
                 "status": "success",
                 "report_path": report_path
@@ -452,10 +461,6 @@ class WorkflowManager:
                 })
             
             raise Exception(f"Workflow execution failed: {str(e)}")
-        
-        finally:
-            if self.db:
-                await self.db.disconnect()
 
     async def reprocess_existing_file(
         self,
@@ -489,9 +494,9 @@ class WorkflowManager:
         
         logger.info(f"Reprocessing file from job: {original_job_id}")
         
-        # Initialize services
-        self.db = DatabaseService()
-        await self.db.connect()
+        # Initialize services (shared, already-connected database service)
+        from app.dependencies import get_database
+        self.db = await get_database()
         self.storage = StorageService()
         
         # Generate new job ID
@@ -534,18 +539,31 @@ class WorkflowManager:
             await self.db.create_job(job_data)
             logger.info(f"Created reprocess job: {new_job_id}")
             
+            # Results are written at checkpoints (after OCR, after feedback,
+            # after report); stage starts only write progress for status pollers
+            
+            # In-memory mirror of the job document, passed to the report agent
+            job_state: Dict[str, Any] = {k: v for k, v in job_data.items() if k != "_id"}
+            
             # ============================================================
             # STAGE 1: PREPROCESSING (reuse existing file)
             # ============================================================
             logger.info("Stage 1: Preprocessing existing file")
             
+            await self.db.update_job(new_job_id, {
+                "state": WorkflowState.PREPROCESSING.value,
+                "current_step": "preprocessing",
+                "progress_percentage": 15
+            })
+            
             # Handle PDF multi-page processing
             is_pdf = file_path.lower().endswith('.pdf')
             if is_pdf:
                 logger.info("Detected multi-page PDF")
                 processor = MultiPageProcessor()
                 pages_dir = os.path.join('uploads', f'{new_job_id}_pages')
-                page_paths = processor.split_pdf_to_pages(file_path, pages_dir)
+                page_paths = await asyncio.to_thread(processor.split_pdf_to_pages, file_path, pages_dir)
+                await self.storage.record_job_files(new_job_id, pages_dir)
                 
                 # Preprocess all pages
                 processed_pages = []
@@ -553,7 +571,7 @@ class WorkflowManager:
                     processed_path = page_path.replace('.jpg', '_processed.jpg')
                     from app.core.image_preprocessor import ImagePreprocessor
                     preprocessor = ImagePreprocessor()
-                    preprocessor.preprocess(page_path, processed_path)
+                    await asyncio.to_thread(preprocessor.preprocess, page_path, processed_path)
                     processed_pages.append(processed_path)
                 
                 workflow_result['stages']['preprocessing'] = {
@@ -567,7 +585,8 @@ class WorkflowManager:
                 # Single image preprocessing
                 from app.core.image_preprocessor import ImagePreprocessor
                 preprocessor = ImagePreprocessor()
-                preprocessor.preprocess(file_path, job_data['processed_image_path'])
+                await asyncio.to_thread(preprocessor.preprocess, file_path, job_data['processed_image_path'])
+                await self.storage.record_job_files(new_job_id, job_data['processed_image_path'])
                 
                 workflow_result['stages']['preprocessing'] = {
                     "status": "success",
@@ -576,12 +595,6 @@ class WorkflowManager:
                 
                 image_path_for_ocr = job_data['processed_image_path']
             
-            await self.db.update_job(new_job_id, {
-                "state": WorkflowState.PREPROCESSING.value,
-                "current_step": "preprocessing",
-                "progress_percentage": 20
-            })
-            
             # ============================================================
             # STAGE 2-6: Continue with rest of pipeline
             # (Copy from execute_autonomous_pipeline, starting from OCR)
@@ -589,6 +602,7 @@ class WorkflowManager:
             
             # STAGE 2: OCR
             logger.info("Stage 2: Vision Agent - OCR Extraction")
+            
             await self.db.update_job(new_job_id, {
                 "state": WorkflowState.OCR_EXTRACTING.value,
                 "current_step": "ocr_extracting",
@@ -602,7 +616,7 @@ class WorkflowManager:
                 total_confidence = 0
                 
                 for page_path in image_path_for_ocr:
-                    text, confidence, _ = ocr_engine.extract_text(page_path)
+                    text, confidence, _ = await asyncio.to_thread(ocr_engine.extract_text, page_path)
                     all_text.append(text)
                     total_confidence += confidence
                 
@@ -622,13 +636,19 @@ class WorkflowManager:
                 "text_length": len(extracted_text)
             }
             
+            # Checkpoint: OCR results
+            checkpoint = {
+                "state": WorkflowState.OCR_EXTRACTED.value,
+                "current_step": "ocr_extracted",
+                "progress_percentage": 40,
+                "extracted_text": extracted_text,
+                "ocr_confidence": avg_confidence
+            }
+            await self.db.update_job(new_job_id, checkpoint)
+            job_state.update(checkpoint)
+            
             # STAGE 3: PARSING
             logger.info("Stage 3: Parser Agent")
-            await self.db.update_job(new_job_id, {
-                "state": WorkflowState.PARSING.value,
-                "current_step": "parsing",
-                "progress_percentage": 50
-            })
             
             parse_result = await self.agent_controller.execute_agent(
                 AgentType.PARSER,
@@ -646,11 +666,6 @@ class WorkflowManager:
             
             # STAGE 4: ASSESSMENT
             logger.info("Stage 4: Assessment Agent")
-            await self.db.update_job(new_job_id, {
-                "state": WorkflowState.ASSESSING.value,
-                "current_step": "assessing",
-                "progress_percentage": 65
-            })
             
             # Get reference answers if available
             answer_key = None
@@ -681,19 +696,8 @@ class WorkflowManager:
                 "percentage": percentage
             }
             
-            await self.db.update_job(new_job_id, {
-                "state": WorkflowState.ASSESSED.value,
-                "current_step": "assessed",
-                "progress_percentage": 75
-            })
-            
             # STAGE 5: FEEDBACK
             logger.info("Stage 5: Feedback Agent")
-            await self.db.update_job(new_job_id, {
-                "state": WorkflowState.GENERATING_FEEDBACK.value,
-                "current_step": "generating_feedback",
-                "progress_percentage": 80
-            })
             
             try:
                 feedback_result = await self.agent_controller.execute_agent(
@@ -720,51 +724,51 @@ class WorkflowManager:
             
             grade = get_grade_from_percentage(percentage)
             
-            await self.db.update_job(new_job_id, {
+            # Checkpoint: parsing, assessment and feedback results
+            checkpoint = {
                 "state": WorkflowState.FEEDBACK_GENERATED.value,
                 "current_step": "feedback_generated",
                 "progress_percentage": 90,
-                "extracted_text": extracted_text,
                 "parsed_answers": parsed_answers,
                 "assessed_answers": assessed_answers,
                 "feedback": feedback_result['feedback'],
                 "total_marks_obtained": assessment_result['total_marks_obtained'],
                 "percentage": percentage,
-                "grade": grade,
-                "ocr_confidence": avg_confidence
-            })
+                "grade": grade
+            }
+            await self.db.update_job(new_job_id, checkpoint)
+            job_state.update(checkpoint)
             
             # STAGE 6: REPORT
             logger.info("Stage 6: Report Generation")
-            await self.db.update_job(new_job_id, {
-                "state": WorkflowState.REPORT_GENERATING.value,
-                "current_step": "report_generating",
-                "progress_percentage": 95
-            })
             
-            job_data_full = await self.db.get_job(new_job_id)
             report_path = self.storage.get_file_path(new_job_id, "report", ".pdf")
             
             report_result = await self.agent_controller.execute_agent(
                 AgentType.REPORT,
                 {
-                    "job_data": job_data_full,
+                    "job_data": job_state,
                     "output_path": report_path,
                     "format": "pdf"
                 }
             )
             
+            await self.storage.record_job_files(new_job_id, report_path)
+            
             workflow_result['stages']['report'] = {
                 "status": "success",
                 "report_path": report_path
             }
             
-            await self.db.update_job(new_job_id, {
+            # Checkpoint: report generated
+            checkpoint = {
                 "state": WorkflowState.COMPLETED.value,
                 "current_step": "completed",
                 "progress_percentage": 100,
                 "report_path": report_path
-            })
+            }
+            await self.db.update_job(new_job_id, checkpoint)
+            job_state.update(checkpoint)
             
             workflow_result['status'] = 'success'
             workflow_result['final_score'] = f"{percentage}%"
@@ -785,7 +789,3 @@ class WorkflowManager:
                 })
             
             raise Exception(f"Reprocessing failed: {str(e)}")
-        
-        finally:
-            if self.db:
-                await self.db.disconnect()
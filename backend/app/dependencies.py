@@ -1,6 +1,7 @@
 """
 Dependency injection for FastAPI endpoints.
 """
+import asyncio
 from functools import lru_cache
 from typing import AsyncGenerator
 from app.config.settings import Settings, get_settings
@@ -8,6 +9,7 @@ from app.services.database_service import DatabaseService
 from app.services.storage_service import StorageService
 from app.services.llm_service import LLMService
 from app.services.pdf_service import PDFService
+from app.services.io_pipeline import AsyncIOPipeline
 from app.services.vision_service import VisionService
 from app.services.notification_service import NotificationService
 from app.core.image_preprocessor import ImagePreprocessor
@@ -23,96 +25,84 @@ from app.config.logging_config import get_logger
 
 logger = get_logger(__name__)
 
-# Global service instances
-_db_service: DatabaseService = None
-_storage_service: StorageService = None
-_llm_service: LLMService = None
-_pdf_service: PDFService = None
-_vision_service: VisionService = None
-_notification_service: NotificationService = None
-_agent_controller: AgentController = None
+# Guards the one-time connect of the shared database service
+_db_connect_lock = asyncio.Lock()
 
 
 async def get_database() -> DatabaseService:
     """Get database service instance."""
-    global _db_service
-    if _db_service is None:
-        _db_service = DatabaseService()
-        await _db_service.connect()
-        logger.info("Database service initialized")
-    return _db_service
+    db = get_db_service()
+    if db.db is None:
+        async with _db_connect_lock:
+            if db.db is None:
+                await db.connect()
+                logger.info("Database service connected")
+    return db
 
 
+@lru_cache(maxsize=1)
 def get_storage() -> StorageService:
     """Get storage service instance."""
-    global _storage_service
-    if _storage_service is None:
-        _storage_service = StorageService()
-        logger.info("Storage service initialized")
-    return _storage_service
+    logger.info("Storage service initialized")
+    return StorageService()
 
 
+@lru_cache(maxsize=1)
 def get_llm_service() -> LLMService:
     """Get LLM service instance."""
-    global _llm_service
-    if _llm_service is None:
-        _llm_service = LLMService()
-        logger.info("LLM service initialized")
-    return _llm_service
+    logger.info("LLM service initialized")
+    return LLMService()
 
 
+@lru_cache(maxsize=1)
 def get_pdf_service() -> PDFService:
     """Get PDF service instance."""
-    global _pdf_service
-    if _pdf_service is None:
-        _pdf_service = PDFService()
-        logger.info("PDF service initialized")
-    return _pdf_service
+    logger.info("PDF service initialized")
+    return PDFService()
 
 
+@lru_cache(maxsize=1)
+def get_io_pipeline() -> AsyncIOPipeline:
+    """Get the shared storage write pipeline."""
+    logger.info("I/O pipeline initialized")
+    return AsyncIOPipeline(get_storage())
+
+
+@lru_cache(maxsize=1)
 def get_vision_service() -> VisionService:
     """Get vision service instance."""
-    global _vision_service
-    if _vision_service is None:
-        _vision_service = VisionService()
-        logger.info("Vision service initialized")
-    return _vision_service
+    logger.info("Vision service initialized")
+    return VisionService()
 
 
+@lru_cache(maxsize=1)
 def get_notification_service() -> NotificationService:
     """Get notification service instance."""
-    global _notification_service
-    if _notification_service is None:
-        _notification_service = NotificationService()
-        logger.info("Notification service initialized")
-    return _notification_service
+    logger.info("Notification service initialized")
+    return NotificationService()
 
 
+@lru_cache(maxsize=1)
 def get_agent_controller() -> AgentController:
     """Get agent controller instance."""
-    global _agent_controller
-    if _agent_controller is None:
-        _agent_controller = AgentController()
-        logger.info("Agent controller initialized")
-    return _agent_controller
+    logger.info("Agent controller initialized")
+    return AgentController()
 
 # ============================================================
 # NEW: Authentication Support Functions
 # ============================================================
 
+@lru_cache(maxsize=1)
 def get_db_service() -> DatabaseService:
     """
     Get database service instance (synchronous wrapper).
     Used for auth endpoints that need DatabaseService type.
     
     Returns:
-        DatabaseService instance
+        DatabaseService instance (connected by get_database at startup)
     """
-    global _db_service
-    if _db_service is None:
-        _db_service = DatabaseService()
-        logger.info("Database service initialized")
-    return _db_service
+    logger.info("Database service initialized")
+    return DatabaseService()
 
 
 def get_storage_service() -> StorageService:
@@ -128,8 +118,10 @@ def get_storage_service() -> StorageService:
 
 async def get_db() -> AsyncGenerator[DatabaseService, None]:
     """
-    Get database service with automatic connection management.
-    Better for auth endpoints - handles connect/disconnect automatically.
+    Get the shared, pooled database service for a request.
+    
+    The underlying Motor client is created once at startup and reused by
+    every request; connections are only closed in cleanup_services().
     
     Yields:
         Connected DatabaseService instance
@@ -138,15 +130,8 @@ async def get_db() -> AsyncGenerator[DatabaseService, None]:
         @router.post("/endpoint")
         async def endpoint(db: DatabaseService = Depends(get_db)):
             # db is already connected
-            # will auto-disconnect after request
     """
-    db = DatabaseService()
-    await db.connect()
-    try:
-        yield db
-    finally:
-        await db.disconnect()
-        logger.debug("Database connection closed for request")
+    yield await get_database()
 
 
 # ============================================================
@@ -155,7 +140,21 @@ async def get_db() -> AsyncGenerator[DatabaseService, None]:
 
 async def cleanup_services():
     """Cleanup all services on shutdown."""
-    global _db_service
-    if _db_service:
-        await _db_service.disconnect()
-        logger.info("All services cleaned up")
\ No newline at end of file
+    if get_db_service.cache_info().currsize:
+        await get_db_service().disconnect()
+    if get_notification_service.cache_info().currsize:
+        await get_notification_service().close()
+    if get_io_pipeline.cache_info().currsize:
+        await get_io_pipeline().close()
+    for factory in (
+        get_db_service,
+        get_storage,
+        get_llm_service,
+        get_pdf_service,
+        get_io_pipeline,
+        get_vision_service,
+        get_notification_service,
+        get_agent_controller,
+    ):
+        factory.cache_clear()
+    logger.info("All services cleaned up")
@@ -2,15 +2,16 @@
 FastAPI application entry point.
 """
 from fastapi import FastAPI, Request
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
-import traceback
+import asyncio
 
 from app.config.settings import settings
 from app.config.logging_config import setup_logging, get_logger
 from app.router import api_router
 from app.dependencies import get_database, cleanup_services
+from app.services.reference_service import ReferenceService
 from app.core.utils import build_response, get_trace_info
 
 # Setup logging
@@ -28,7 +29,15 @@ async def lifespan(app: FastAPI):
     
     try:
         # Initialize database connection
-        await get_database()
+        db = await get_database()
+        await db.ensure_indexes()
+        await ReferenceService(db).ensure_indexes()
+        
+        # Optionally load the TrOCR model before serving requests
+        if settings.trocr_preload:
+            from app.core.trocr_engine import get_trocr_engine
+            await asyncio.to_thread(get_trocr_engine)
+            logger.info("TrOCR engine preloaded")
         logger.info("Application startup completed successfully")
     except Exception as e:
         logger.error(f"Startup failed: {str(e)}", exc_info=True)
@@ -48,6 +57,7 @@ app = FastAPI(
     version=settings.app_version,
     description="Agentic AI system for automated test paper assessment",
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
     swagger_ui_init_oauth={
         "usePkceWithAuthorizationCodeGrant": True,
     }
@@ -76,16 +86,14 @@ async def global_exception_handler(request: Request, exc: Exception):
     Returns:
         JSON response with error details
     """
-    # Get detailed trace
+    # Get trace location once (file:function:line)
     trace = get_trace_info()
-    error_traceback = traceback.format_exc()
     
-    # Log the error
+    # Log the error; the traceback is formatted lazily by the log handlers
     logger.error(
         f"Unhandled exception at {request.url.path}",
-        exc_info=True
+        exc_info=exc
     )
-    logger.error(f"Traceback:\n{error_traceback}")
     
     # Build error response
     response = build_response(
@@ -95,7 +103,7 @@ async def global_exception_handler(request: Request, exc: Exception):
         trace=trace
     )
     
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=500,
         content=response
     )
@@ -2,10 +2,14 @@
 Database document models for MongoDB collections.
 """
 from typing import List, Optional, Dict, Any
-from datetime import datetime
+from datetime import datetime, timezone
+from functools import partial
 from pydantic import BaseModel, Field
 from app.models.enums import WorkflowState, QuestionType, Grade, Subject
 
+# Timezone-aware "now" factory shared by document timestamp fields
+_utcnow = partial(datetime.now, timezone.utc)
+
 class ReferenceDocument(BaseModel):
     """MongoDB document model for teacher reference answers."""
     reference_id: str = Field(..., description="Unique reference identifier")
@@ -31,8 +35,8 @@ class ReferenceDocument(BaseModel):
     metadata: Dict[str, Any] = Field(default_factory=dict)
     
     # Timestamps
-    created_at: datetime = Field(default_factory=datetime.utcnow)
-    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=_utcnow)
+    updated_at: datetime = Field(default_factory=_utcnow)
     
     class Config:
         json_schema_extra = {
@@ -97,8 +101,8 @@ class JobDocument(BaseModel):
     error_message: Optional[str] = None
 
     # Timestamps
-    created_at: datetime = Field(default_factory=datetime.timezone.utc)
-    updated_at: datetime = Field(default_factory=datetime.timezone.utc)
+    created_at: datetime = Field(default_factory=_utcnow)
+    updated_at: datetime = Field(default_factory=_utcnow)
 
     class Config:
         json_schema_extra = {
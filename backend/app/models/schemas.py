@@ -22,15 +22,6 @@ class BaseResponse(BaseModel):
 # Image Upload Schemas
 # ============================================================================
 
-class ImageUploadRequest(BaseModel):
-    """Request schema for image upload metadata."""
-    student_name: str = Field(..., min_length=1, max_length=200)
-    student_id: str = Field(..., min_length=1, max_length=100)
-    exam_name: str = Field(..., min_length=1, max_length=200)
-    subject: Subject
-    total_marks: int = Field(..., gt=0, le=1000)
-    metadata: Optional[Dict[str, Any]] = Field(default_factory=dict)
-
 class ImageUploadResponse(BaseModel):
     """Response schema for image upload."""
     job_id: str = Field(..., description="Unique job identifier")
@@ -1,23 +1,73 @@
 """
 MongoDB database service for CRUD operations.
 """
-from typing import Optional, List, Dict, Any
+import logging
+from typing import Optional, List, Dict, Any, Tuple, AsyncIterator
 from datetime import datetime, timezone, timedelta
+from bson import ObjectId
 from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase, AsyncIOMotorCollection
 from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError, OperationFailure
 from app.config.logging_config import get_logger
 from app.config.settings import settings
 import uuid
 
 logger = get_logger(__name__)
 
+# ✅ IST timezone (UTC + 5:30) used for job timestamps
+IST = timezone(timedelta(hours=5, minutes=30))
+
+# Dashboard submission counts stop scanning index keys past this value
+MAX_SUBMISSION_COUNT = 10000
+
+# Dashboard list views only need these fields, not OCR text or answers
+SUBMISSION_SUMMARY_PROJECTION = {
+    "_id": 0,
+    "job_id": 1,
+    "student_name": 1,
+    "student_id": 1,
+    "state": 1,
+    "percentage": 1,
+    "grade": 1,
+    "total_marks_obtained": 1,
+    "total_marks": 1,
+    "created_at": 1
+}
+# Status polls are answered from the covering index built on these fields
+JOB_STATUS_FIELDS = ["job_id", "state", "progress_percentage", "report_path", "updated_at"]
+JOB_STATUS_PROJECTION = {"_id": 0, **{field: 1 for field in JOB_STATUS_FIELDS}}
+
+# Server codes for an index that clashes with an existing one (IndexOptionsConflict, IndexKeySpecsConflict)
+INDEX_CONFLICT_CODES = frozenset({85, 86})
+
+REFERENCE_SUMMARY_PROJECTION = {
+    "_id": 0,
+    "reference_id": 1,
+    "teacher_name": 1,
+    "teacher_email": 1,
+    "exam_name": 1,
+    "subject": 1,
+    "total_marks": 1,
+    "is_active": 1,
+    "ocr_completed": 1,
+    "created_at": 1,
+    "updated_at": 1
+}
+
 
 class DatabaseService:
     """Handles MongoDB operations for job data."""
     
-    def __init__(self):
-        """Initialize database service."""
-        self.client: Optional[AsyncIOMotorClient] = None
+    def __init__(self, client: Optional[AsyncIOMotorClient] = None):
+        """
+        Initialize database service.
+        
+        Args:
+            client: Optional shared Motor client. When omitted, connect()
+                dials a new pooled client owned by this service.
+        """
+        self.client: Optional[AsyncIOMotorClient] = client
+        self._owns_client = client is None
         self.db: Optional[AsyncIOMotorDatabase] = None
         self.jobs_collection: Optional[AsyncIOMotorCollection] = None
         logger.info("DatabaseService initialized")
@@ -40,8 +90,16 @@ class DatabaseService:
     async def connect(self):
         """Establish MongoDB connection."""
         try:
-            logger.info(f"Connecting to MongoDB: {settings.mongodb_url}")
-            self.client = AsyncIOMotorClient(settings.mongodb_url)
+            if self.client is None:
+                logger.info(f"Connecting to MongoDB: {settings.mongodb_url}")
+                self.client = AsyncIOMotorClient(
+                    settings.mongodb_url,
+                    maxPoolSize=settings.mongodb_max_pool_size,
+                    minPoolSize=settings.mongodb_min_pool_size,
+                    # Single-statement writes (inserts included) are retried once by the driver
+                    retryWrites=True
+                )
+                self._owns_client = True
             self.db = self.client[settings.mongodb_db_name]
             self.jobs_collection = self.db['jobs']
             
@@ -49,18 +107,85 @@ class DatabaseService:
             await self.client.admin.command('ping')
             logger.info("MongoDB connection established successfully")
             
-            # Create indexes
+        except Exception as e:
+            logger.error(f"MongoDB connection failed: {str(e)}", exc_info=True)
+            raise Exception(f"Database connection failed: {str(e)}")
+    
+    async def ensure_indexes(self) -> None:
+        """Create the job, reference and user indexes. Run once at startup."""
+        try:
             await self.jobs_collection.create_index("job_id", unique=True)
-            await self.jobs_collection.create_index("created_at")
+            await self._ensure_created_at_index()
+            await self.jobs_collection.create_index([("created_at", -1), ("_id", -1)])
+            await self.jobs_collection.create_index([(field, 1) for field in JOB_STATUS_FIELDS])
+            
+            # Teacher dashboard lookups (equality field first, then sort key)
+            await self.jobs_collection.create_index([("reference_id", 1), ("created_at", -1)])
+            await self.db.references.create_index([("teacher_email", 1), ("created_at", -1)])
+            
+            # Auth lookups run on every authenticated request
+            await self._create_user_lookup_index("user_id")
+            await self._create_user_lookup_index("email")
             logger.info("Database indexes created")
             
         except Exception as e:
-            logger.error(f"MongoDB connection failed: {str(e)}", exc_info=True)
-            raise Exception(f"Database connection failed: {str(e)}")
+            logger.error(f"Database index creation failed: {str(e)}", exc_info=True)
+            raise Exception(f"Database index creation failed: {str(e)}")
+    
+    async def _ensure_created_at_index(self) -> None:
+        """
+        Create or reconcile the jobs created_at index with the JOB_TTL_DAYS setting.
+        
+        A TTL lifetime change is applied in place with collMod; switching
+        between a plain and a TTL index drops and recreates it.
+        """
+        ttl_seconds = settings.job_ttl_days * 86400 if settings.job_ttl_days > 0 else None
+        existing = (await self.jobs_collection.index_information()).get("created_at_1")
+        
+        if existing is not None:
+            current_ttl = existing.get("expireAfterSeconds")
+            if current_ttl == ttl_seconds:
+                return
+            if current_ttl is not None and ttl_seconds is not None:
+                await self.db.command({
+                    "collMod": self.jobs_collection.name,
+                    "index": {"keyPattern": {"created_at": 1}, "expireAfterSeconds": ttl_seconds}
+                })
+                logger.info(f"Job TTL changed from {current_ttl}s to {ttl_seconds}s")
+                return
+            await self.jobs_collection.drop_index("created_at_1")
+            logger.info("Dropped created_at index to change its TTL option")
+        
+        if ttl_seconds is not None:
+            await self.jobs_collection.create_index("created_at", expireAfterSeconds=ttl_seconds)
+        else:
+            await self.jobs_collection.create_index("created_at")
+    
+    async def _create_user_lookup_index(self, field: str) -> None:
+        """
+        Index a users field as unique, or as a plain index if duplicates already exist.
+        
+        An existing index on the field is kept as-is, unique or not, so a
+        fallback index built on an earlier startup does not conflict later.
+        
+        Args:
+            field: Users field to index
+        """
+        indexes = await self.db.users.index_information()
+        if any([key for key, _ in info["key"]] == [field] for info in indexes.values()):
+            return
+        
+        try:
+            await self.db.users.create_index(field, unique=True)
+        except (DuplicateKeyError, OperationFailure) as e:
+            if not isinstance(e, DuplicateKeyError) and e.code not in INDEX_CONFLICT_CODES:
+                raise
+            logger.warning(f"Cannot build unique users.{field} index ({str(e)}); creating non-unique index instead")
+            await self.db.users.create_index(field)
     
     async def disconnect(self):
-        """Close MongoDB connection."""
-        if self.client:
+        """Close MongoDB connection if this service owns the client."""
+        if self.client and self._owns_client:
             self.client.close()
             logger.info("MongoDB connection closed")
     
@@ -70,37 +195,60 @@ class DatabaseService:
         """
         try:
             logger.info(f"Creating job: {job_data['job_id']}")
-
-            # ✅ Use IST timezone (UTC + 5:30)
-            IST = timezone(timedelta(hours=5, minutes=30))
-            
-            # Debug: Check if timestamps exist before adding
-            logger.info(f"[DEBUG] created_at before auto-add: {job_data.get('created_at')}")
-            logger.info(f"[DEBUG] updated_at before auto-add: {job_data.get('updated_at')}")
             
             # Auto-add timestamps if not present
-            if "created_at" not in job_data:
-                job_data["created_at"] = datetime.now(IST)
-                logger.info(f"[DEBUG] Auto-added created_at: {job_data['created_at']}")
+            if "created_at" not in job_data or "updated_at" not in job_data:
+                now = datetime.now(IST)
+                job_data.setdefault("created_at", now)
+                job_data.setdefault("updated_at", now)
             
-            if "updated_at" not in job_data:
-                job_data["updated_at"] = datetime.now(IST)
-                logger.info(f"[DEBUG] Auto-added updated_at: {job_data['updated_at']}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(
+                    f"Job timestamps: created_at={job_data['created_at']}, "
+                    f"updated_at={job_data['updated_at']}"
+                )
             
             # Insert into database
             result = await self.jobs_collection.insert_one(job_data)
             logger.info(f"Job created with ID: {result.inserted_id} at {job_data['created_at']}")
             
-            # Debug: Verify what was inserted
-            inserted_job = await self.jobs_collection.find_one({"job_id": job_data["job_id"]})
-            logger.info(f"[DEBUG] Verified in DB - created_at: {inserted_job.get('created_at')}")
-            
             return job_data
             
         except Exception as e:
             logger.error(f"Job creation failed: {str(e)}", exc_info=True)
             raise Exception(f"Job creation failed: {str(e)}")
     
+    async def create_jobs_bulk(self, jobs: List[Dict[str, Any]]) -> List[str]:
+        """
+        Create multiple job documents in a single round-trip.
+        
+        Args:
+            jobs: List of job data dictionaries
+            
+        Returns:
+            List of created job IDs
+        """
+        if not jobs:
+            return []
+        
+        try:
+            logger.info(f"Creating {len(jobs)} jobs in bulk")
+            
+            # One timestamp for the whole batch
+            now = datetime.now(IST)
+            for job in jobs:
+                job.setdefault("created_at", now)
+                job.setdefault("updated_at", now)
+            
+            await self.jobs_collection.insert_many(jobs, ordered=False)
+            logger.info(f"Bulk job creation completed: {len(jobs)} jobs")
+            
+            return [job["job_id"] for job in jobs]
+            
+        except Exception as e:
+            logger.error(f"Bulk job creation failed: {str(e)}", exc_info=True)
+            raise Exception(f"Bulk job creation failed: {str(e)}")
+    
     async def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
         """
         Retrieve job by ID.
@@ -122,13 +270,37 @@ class DatabaseService:
             logger.error(f"Job retrieval failed: {str(e)}", exc_info=True)
             return None
     
+    async def get_job_status(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Retrieve only the status fields of a job.
+        
+        The projection matches the job status index exactly, so MongoDB
+        can answer the query without fetching the full document.
+        
+        Args:
+            job_id: Job identifier
+            
+        Returns:
+            Status fields (state, progress, report path, updated_at) or None
+        """
+        try:
+            status = await self.jobs_collection.find_one(
+                {"job_id": job_id},
+                JOB_STATUS_PROJECTION,
+                hint=[(field, 1) for field in JOB_STATUS_FIELDS]
+            )
+            if not status:
+                logger.warning(f"Job not found: {job_id}")
+            return status
+        except Exception as e:
+            logger.error(f"Job status retrieval failed: {str(e)}", exc_info=True)
+            return None
+    
     async def update_job(self, job_id: str, updates: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """
         Update job data with automatic timestamp handling.
         """
         try:
-            # ✅ Use IST timezone (UTC + 5:30)
-            IST = timezone(timedelta(hours=5, minutes=30))
             updates['updated_at'] = datetime.now(IST)
             
             logger.info(f"Updating job: {job_id} at {updates['updated_at']}")
@@ -175,31 +347,78 @@ class DatabaseService:
     
     async def list_jobs(
         self,
-        skip: int = 0,
+        after: Optional[Tuple[datetime, str]] = None,
         limit: int = 100,
         filters: Optional[Dict[str, Any]] = None
-    ) -> List[Dict[str, Any]]:
+    ) -> Tuple[List[Dict[str, Any]], Optional[Tuple[datetime, str]]]:
         """
-        List jobs with pagination and filtering.
+        List jobs newest first using range-based (keyset) pagination.
         
         Args:
-            skip: Number of documents to skip
+            after: Cursor token (created_at, _id) returned by the previous page
             limit: Maximum number of documents to return
             filters: Optional filter criteria
             
         Returns:
-            List of job documents
+            Tuple of (job documents, next cursor token or None when exhausted)
         """
         try:
-            query = filters or {}
-            cursor = self.jobs_collection.find(query, {"_id": 0}).skip(skip).limit(limit)
+            query = dict(filters or {})
+            if after:
+                after_ts, after_id = after
+                after_oid = ObjectId(after_id)
+                query["$or"] = [
+                    {"created_at": {"$lt": after_ts}},
+                    {"created_at": after_ts, "_id": {"$lt": after_oid}}
+                ]
+            
+            cursor = (
+                self.jobs_collection.find(query)
+                .sort([("created_at", -1), ("_id", -1)])
+                .limit(limit)
+            )
             jobs = await cursor.to_list(length=limit)
+            
+            next_token = None
+            if len(jobs) == limit:
+                last = jobs[-1]
+                next_token = (last["created_at"], str(last["_id"]))
+            for job in jobs:
+                job.pop("_id", None)
+            
             logger.debug(f"Retrieved {len(jobs)} jobs")
-            return jobs
+            return jobs, next_token
         except Exception as e:
             logger.error(f"Job listing failed: {str(e)}", exc_info=True)
-            return []
+            return [], None
+        
+    async def watch_jobs(
+        self,
+        resume_token: Optional[Dict[str, Any]] = None
+    ) -> AsyncIterator[Tuple[Dict[str, Any], Dict[str, Any]]]:
+        """
+        Stream newly created jobs as they are inserted.
+        
+        Uses a MongoDB change stream (requires a replica set) so callers are
+        pushed new submissions instead of polling list_jobs.
         
+        Args:
+            resume_token: Token from a previously yielded event to resume after
+            
+        Yields:
+            Tuples of (job document, resume token)
+        """
+        pipeline = [{"$match": {"operationType": "insert"}}]
+        try:
+            async with self.jobs_collection.watch(pipeline, resume_after=resume_token) as stream:
+                async for change in stream:
+                    job = change["fullDocument"]
+                    job.pop("_id", None)
+                    yield job, change["_id"]
+        except Exception as e:
+            logger.error(f"Job change stream failed: {str(e)}", exc_info=True)
+            raise Exception(f"Job change stream failed: {str(e)}")
+    
     async def get_jobs_by_query(
         self,
         query: Dict[str, Any],
@@ -293,7 +512,10 @@ class DatabaseService:
     async def get_references_by_teacher(self, teacher_email: str) -> List[Dict[str, Any]]:
         """Get all references uploaded by a teacher."""
         try:
-            cursor = self.db.references.find({"teacher_email": teacher_email})
+            cursor = self.db.references.find(
+                {"teacher_email": teacher_email},
+                REFERENCE_SUMMARY_PROJECTION
+            )
             references = await cursor.to_list(length=100)
             
             return [self._convert_objectid(ref) for ref in references]
@@ -302,25 +524,58 @@ class DatabaseService:
             return []
 
 
-    async def count_submissions_for_reference(self, reference_id: str) -> int:
-        """Count how many students submitted for this reference."""
+    async def get_teacher_dashboard(self, teacher_email: str) -> List[Dict[str, Any]]:
+        """Get a teacher's references with submission counts in one aggregation."""
         try:
-            count = await self.db.jobs.count_documents({"reference_id": reference_id})
-            return count
+            pipeline = [
+                {"$match": {"teacher_email": teacher_email}},
+                {"$limit": 100},
+                {"$project": REFERENCE_SUMMARY_PROJECTION},
+                {"$lookup": {
+                    "from": "jobs",
+                    "localField": "reference_id",
+                    "foreignField": "reference_id",
+                    "pipeline": [{"$limit": MAX_SUBMISSION_COUNT}, {"$count": "count"}],
+                    "as": "submission_stats"
+                }},
+                {"$addFields": {
+                    "submission_count": {
+                        "$ifNull": [{"$arrayElemAt": ["$submission_stats.count", 0]}, 0]
+                    }
+                }},
+                {"$project": {"submission_stats": 0}}
+            ]
+            references = await self.db.references.aggregate(pipeline).to_list(length=100)
+            return [self._convert_objectid(ref) for ref in references]
         except Exception as e:
-            logger.error(f"Failed to count submissions: {str(e)}")
-            return 0
+            logger.error(f"Failed to get teacher dashboard: {str(e)}")
+            return []
 
 
-    async def get_submissions_by_reference(self, reference_id: str) -> List[Dict[str, Any]]:
-        """Get all student submissions for a reference."""
+    async def iter_submissions_by_reference(
+        self,
+        reference_id: str,
+        limit: int = 1000,
+        projection: Optional[Dict[str, Any]] = SUBMISSION_SUMMARY_PROJECTION
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Stream student submission summaries for a reference in cursor batches."""
         try:
-            cursor = self.db.jobs.find({"reference_id": reference_id})
-            submissions = await cursor.to_list(length=1000)
-            return [self._convert_objectid(sub) for sub in submissions]
+            cursor = (
+                self.db.jobs.find({"reference_id": reference_id}, projection)
+                .limit(limit)
+                .batch_size(500)
+            )
+            async for sub in cursor:
+                yield self._convert_objectid(sub)
         except Exception as e:
-            logger.error(f"Failed to get submissions: {str(e)}")
-            return []
+            # Documents may already have been yielded, so fail loudly rather than return a partial list
+            logger.error(f"Failed to get submissions: {str(e)}", exc_info=True)
+            raise Exception(f"Submission fetch failed: {str(e)}")
+
+
+    async def get_submissions_by_reference(self, reference_id: str) -> List[Dict[str, Any]]:
+        """Get all student submission summaries for a reference."""
+        return [sub async for sub in self.iter_submissions_by_reference(reference_id)]
 
 
     async def get_reference_by_id(self, reference_id: str) -> Optional[Dict[str, Any]]:
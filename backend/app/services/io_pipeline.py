@@ -0,0 +1,107 @@
+"""
+Asynchronous write pipeline that overlaps storage I/O with compute.
+"""
+import asyncio
+from typing import Optional, Tuple, Union
+from app.config.logging_config import get_logger
+from app.core.utils import retry_async
+from app.services.storage_service import StorageService
+
+logger = get_logger(__name__)
+
+# Writes queued before submit() starts applying backpressure to producers
+IO_PIPELINE_MAX_PENDING = 8
+
+# Attempts per write; see retry_async for the backoff schedule
+IO_PIPELINE_MAX_ATTEMPTS = 3
+
+
+class AsyncIOPipeline:
+    """
+    Producer-consumer pipeline for storage writes.
+
+    Producers submit finished outputs and continue with their next batch
+    while a background worker persists queued outputs through
+    StorageService, retrying failed writes with exponential backoff.
+    """
+
+    def __init__(
+        self,
+        storage: StorageService,
+        max_pending: int = IO_PIPELINE_MAX_PENDING,
+        max_attempts: int = IO_PIPELINE_MAX_ATTEMPTS
+    ):
+        """
+        Initialize the pipeline.
+
+        Args:
+            storage: Storage service used for writes
+            max_pending: Maximum number of queued writes
+            max_attempts: Attempts per write before giving up
+        """
+        self.storage = storage
+        self.max_attempts = max_attempts
+        self._queue: asyncio.Queue[Tuple[str, Union[bytes, memoryview], Optional[str], asyncio.Future]] = asyncio.Queue(maxsize=max_pending)
+        self._worker: Optional[asyncio.Task] = None
+        logger.info(f"AsyncIOPipeline initialized (max pending writes: {max_pending})")
+
+    async def submit(
+        self,
+        file_path: str,
+        data: Union[bytes, memoryview],
+        job_id: Optional[str] = None
+    ) -> asyncio.Future:
+        """
+        Queue data to be written to a file.
+
+        Waits only while the queue is full, then returns immediately.
+
+        Args:
+            file_path: Destination file path
+            data: File contents; a memoryview is written without copying
+            job_id: Optional job identifier the file is recorded against
+
+        Returns:
+            Future resolving to the number of bytes written
+        """
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._run())
+
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((file_path, data, job_id, future))
+        logger.debug(f"Write queued: {file_path} ({len(data)} bytes)")
+        return future
+
+    async def drain(self) -> None:
+        """Wait until every queued write has finished."""
+        await self._queue.join()
+
+    async def close(self) -> None:
+        """Finish queued writes and stop the worker."""
+        if self._worker is None:
+            return
+        await self.drain()
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+        self._worker = None
+        logger.info("AsyncIOPipeline closed")
+
+    async def _run(self) -> None:
+        """Consume queued writes until cancelled."""
+        while True:
+            file_path, data, job_id, future = await self._queue.get()
+            try:
+                file_size = await retry_async(
+                    self.storage.save_bytes, file_path, data, job_id, attempts=self.max_attempts
+                )
+                if not future.done():
+                    future.set_result(file_size)
+            except Exception as e:
+                logger.error(f"Pipeline write failed: {file_path}: {str(e)}", exc_info=True)
+                if not future.done():
+                    future.set_exception(e)
+            finally:
+                self._queue.task_done()
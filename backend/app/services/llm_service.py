@@ -1,6 +1,9 @@
 """
 LLM service wrapper for interacting with Google Gemini AI models.
 """
+import asyncio
+import hashlib
+from collections import OrderedDict
 from typing import List, Dict, Any
 import google.generativeai as genai
 from app.config.logging_config import get_logger
@@ -8,6 +11,13 @@ from app.config.settings import settings
 
 logger = get_logger(__name__)
 
+# Maximum number of in-flight Gemini requests per service instance
+LLM_MAX_CONCURRENCY = 8
+
+# Token count cache size, and text length above which counts are estimated locally
+TOKEN_CACHE_SIZE = 4096
+TOKEN_ESTIMATE_MIN_CHARS = 100_000
+
 
 class LLMService:
     """Service for interacting with Google Gemini Large Language Models."""
@@ -41,6 +51,12 @@ class LLMService:
             },
         ]
         
+        # Caps concurrent requests to stay within API rate limits
+        self._semaphore = asyncio.Semaphore(LLM_MAX_CONCURRENCY)
+        
+        # LRU cache of token counts keyed by text digest
+        self._token_cache: "OrderedDict[str, int]" = OrderedDict()
+        
         logger.info(f"LLMService initialized with Gemini model: {self.model_name}")
     
     async def generate_completion(
@@ -80,12 +96,13 @@ class LLMService:
                 top_k=40
             )
             
-            # Generate content
-            response = self.model.generate_content(
-                combined_prompt,
-                generation_config=generation_config,
-                safety_settings=self.safety_settings
-            )
+            # Generate content without blocking the event loop
+            async with self._semaphore:
+                response = await self.model.generate_content_async(
+                    combined_prompt,
+                    generation_config=generation_config,
+                    safety_settings=self.safety_settings
+                )
             
             # Extract text from response
             content = response.text
@@ -104,7 +121,7 @@ class LLMService:
         max_tokens: int = 1000
     ) -> List[str]:
         """
-        Generate multiple completions in batch.
+        Generate multiple completions concurrently.
         
         Args:
             prompts: List of prompt dictionaries with 'system' and 'user' keys
@@ -116,16 +133,24 @@ class LLMService:
         """
         try:
             logger.info(f"Generating {len(prompts)} completions in batch")
-            results = []
             
-            for prompt in prompts:
-                result = await self.generate_completion(
-                    system_prompt=prompt.get('system', ''),
-                    user_prompt=prompt.get('user', ''),
-                    temperature=temperature,
-                    max_tokens=max_tokens
-                )
-                results.append(result)
+            results = await asyncio.gather(
+                *(
+                    self.generate_completion(
+                        system_prompt=prompt.get('system', ''),
+                        user_prompt=prompt.get('user', ''),
+                        temperature=temperature,
+                        max_tokens=max_tokens
+                    )
+                    for prompt in prompts
+                ),
+                return_exceptions=True
+            )
+            
+            # Surface the first failure once every request has settled
+            for result in results:
+                if isinstance(result, Exception):
+                    raise result
             
             logger.info(f"Batch generation completed: {len(results)} results")
             return results
@@ -144,9 +169,23 @@ class LLMService:
         Returns:
             Token count
         """
+        # Very long texts: a ~4 chars/token estimate avoids a slow API call
+        if len(text) >= TOKEN_ESTIMATE_MIN_CHARS:
+            return len(text) // 4
+        
+        key = hashlib.sha1(text.encode("utf-8")).hexdigest()
+        cached = self._token_cache.get(key)
+        if cached is not None:
+            self._token_cache.move_to_end(key)
+            return cached
+        
         try:
             token_count = self.model.count_tokens(text).total_tokens
             logger.debug(f"Token count: {token_count}")
+            
+            self._token_cache[key] = token_count
+            if len(self._token_cache) > TOKEN_CACHE_SIZE:
+                self._token_cache.popitem(last=False)
             return token_count
         except Exception as e:
             logger.error(f"Token counting failed: {str(e)}")
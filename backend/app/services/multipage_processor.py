@@ -1,18 +1,38 @@
 """
 Multi-page document processing service with built-in PDF conversion.
 """
+import asyncio
 import os
-from typing import List, Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Tuple, Optional
+import cv2
 import fitz  # PyMuPDF
+import numpy as np
 from PIL import Image
 from app.config.logging_config import get_logger
+from app.config.settings import settings
 from app.core.image_preprocessor import ImagePreprocessor
-from app.core.trocr_engine import TrOCREngine
+from app.core.trocr_engine import get_trocr_engine
 from app.core.ocr_engine import OCREngine
 from app.core.answer_parser import AnswerParser
+from app.services.storage_service import StorageService
 
 logger = get_logger(__name__)
 
+# Upper bound on pages processed concurrently. Tesseract runs as a
+# subprocess and TrOCR inference runs in torch C++ code, so threads overlap well.
+MAX_PAGE_WORKERS = min(8, os.cpu_count() or 1)
+
+# Render resolution: 200 DPI is enough for printed text, handwriting gets more detail
+PRINTED_DPI = 200
+HANDWRITING_DPI = 250
+
+# Image-free pages with at least this much embedded text are read directly instead of OCR'd
+MIN_EMBEDDED_TEXT_CHARS = 50
+
+# Shared page pool so concurrent requests cannot oversubscribe the CPU
+_page_executor = ThreadPoolExecutor(max_workers=MAX_PAGE_WORKERS, thread_name_prefix="page-ocr")
+
 
 class MultiPageProcessor:
     """Handles multi-page PDF processing with built-in conversion."""
@@ -24,10 +44,9 @@ class MultiPageProcessor:
         self.trocr_engine = None  # NEW: Initialize as None
         self.use_trocr = use_trocr  # NEW: Store preference
         self.parser = AnswerParser()
-        # Initialize TrOCR if requested
+        # Use the shared TrOCR engine if requested
         if use_trocr:
-            logger.info("Initializing TrOCR engine for handwritten text...")
-            self.trocr_engine = TrOCREngine()
+            self.trocr_engine = get_trocr_engine()
         
         logger.info(f"MultiPageProcessor initialized (TrOCR: {use_trocr})")
     
@@ -35,7 +54,7 @@ class MultiPageProcessor:
         self,
         pdf_path: str,
         output_dir: str,
-        dpi: int = 300
+        dpi: int = PRINTED_DPI
     ) -> List[str]:
         """
         Split PDF into individual page images using PyMuPDF.
@@ -88,7 +107,121 @@ class MultiPageProcessor:
             logger.error(f"PDF splitting failed: {str(e)}", exc_info=True)
             raise Exception(f"PDF splitting failed: {str(e)}")
     
-    def process_all_pages(
+    def split_pdf_to_arrays(
+        self,
+        pdf_path: str,
+        dpi: int = PRINTED_DPI,
+        use_embedded_text: bool = True
+    ) -> List[Tuple[Optional[np.ndarray], Optional[str]]]:
+        """
+        Render PDF pages to in-memory grayscale image arrays using PyMuPDF.
+        
+        Unlike split_pdf_to_pages, no JPEG is encoded or written to disk.
+        Pages are rasterized straight to grayscale, which is all the OCR
+        engines consume, and wrapped as NumPy arrays without a further copy.
+        Born-digital pages (a text layer and no embedded images) are not
+        rendered. Scanned pages are always rendered, even when the scanner
+        added its own text layer, since that text misses handwriting.
+        
+        Args:
+            pdf_path: Path to PDF file
+            dpi: Resolution for conversion
+            use_embedded_text: Read born-digital pages from their text layer;
+                disable to render and OCR every page (handwriting mode)
+            
+        Returns:
+            List of (image, embedded_text) tuples, one per page. Exactly one
+            of the two is set: the (height, width) uint8 array for scanned
+            pages, or the extracted text for digital pages.
+        """
+        try:
+            logger.info(f"Rendering PDF pages in memory: {pdf_path}")
+            
+            zoom = dpi / 72  # Convert DPI to zoom factor
+            mat = fitz.Matrix(zoom, zoom)
+            pages = []
+            
+            with fitz.open(pdf_path) as pdf_document:
+                logger.info(f"PDF has {len(pdf_document)} pages")
+                for page in pdf_document:
+                    if use_embedded_text and not page.get_images():
+                        embedded_text = page.get_text().strip()
+                        if len(embedded_text) >= MIN_EMBEDDED_TEXT_CHARS:
+                            pages.append((None, embedded_text))
+                            continue
+                    
+                    # The array views the pixmap's sample bytes and keeps them alive
+                    pix = page.get_pixmap(matrix=mat, colorspace=fitz.csGRAY, alpha=False)
+                    gray = np.frombuffer(pix.samples, dtype=np.uint8).reshape(pix.height, pix.width)
+                    pages.append((gray, None))
+            
+            rendered = sum(1 for image, _ in pages if image is not None)
+            logger.info(f"PDF rendered into {rendered} page images ({len(pages) - rendered} digital text pages)")
+            return pages
+            
+        except Exception as e:
+            logger.error(f"PDF rendering failed: {str(e)}", exc_info=True)
+            raise Exception(f"PDF rendering failed: {str(e)}")
+    
+    def _preprocess_page(
+        self,
+        index: int,
+        page: np.ndarray,
+        debug_dir: Optional[str] = None
+    ) -> np.ndarray:
+        """
+        Preprocess a single in-memory page image.
+        
+        Args:
+            index: Zero-based page index
+            page: Page image array
+            debug_dir: If set, the processed page is also written here
+            
+        Returns:
+            Processed page image array
+        """
+        page_num = index + 1
+        logger.info(f"Processing page {page_num}...")
+        
+        processed, _ = self.preprocessor.preprocess_array(page)
+        if debug_dir:
+            cv2.imwrite(os.path.join(debug_dir, f'page_{page_num}_processed.jpg'), processed)
+        
+        return processed
+    
+    def _process_single_page(
+        self,
+        index: int,
+        page: Optional[np.ndarray],
+        debug_dir: Optional[str] = None,
+        embedded_text: Optional[str] = None
+    ) -> Tuple[str, float]:
+        """
+        Preprocess and Tesseract-OCR a single in-memory page image.
+        
+        Args:
+            index: Zero-based page index
+            page: Page image array (None for digital text pages)
+            debug_dir: If set, the processed page is also written here
+            embedded_text: Text layer of a digital page; OCR is skipped
+            
+        Returns:
+            Tuple of (extracted_text, confidence)
+        """
+        page_num = index + 1
+        
+        if embedded_text is not None:
+            logger.info(f"Page {page_num} has embedded text, skipping OCR")
+            return embedded_text, 100.0
+        
+        processed = self._preprocess_page(index, page, debug_dir)
+        
+        text, confidence, _ = self.ocr_engine.extract_text(processed)
+        logger.info(f"Page {page_num} Tesseract OCR completed. Confidence: {confidence}%")
+        
+        return text, confidence
+    
+    async def process_all_pages(
         self,
         pdf_path: str,
         job_id: str,
@@ -98,6 +231,9 @@ class MultiPageProcessor:
         """
         Process all pages of a PDF: preprocess, OCR, parse.
         
+        Rendering and OCR run in worker threads so the event loop stays
+        responsive while a PDF is being processed.
+        
         Args:
             pdf_path: Path to PDF file
             job_id: Job identifier
@@ -112,43 +248,55 @@ class MultiPageProcessor:
             logger.info(f"Processing multi-page PDF: {pdf_path}")
             logger.info(f"Handwriting mode: {use_trocr_for_this_job}")
             
-            # Split PDF to pages
-            pages_dir = os.path.join('uploads', f'{job_id}_pages')
-            page_paths = self.split_pdf_to_pages(pdf_path, pages_dir)
+            # Render PDF pages in memory
+            dpi = HANDWRITING_DPI if use_trocr_for_this_job else PRINTED_DPI
+            pages = await asyncio.to_thread(
+                self.split_pdf_to_arrays, pdf_path, dpi, not use_trocr_for_this_job
+            )
             
-            # Process each page
-            all_text = []
-            total_confidence = 0
+            # Only persist processed pages when debugging
+            debug_dir = None
+            page_paths = []
+            if settings.debug:
+                debug_dir = os.path.join('uploads', f'{job_id}_pages')
+                os.makedirs(debug_dir, exist_ok=True)
+                await StorageService().record_job_files(job_id, debug_dir)
+                page_paths = [
+                    os.path.join(debug_dir, f'page_{i}_processed.jpg')
+                    for i, (image, _) in enumerate(pages, start=1)
+                    if image is not None
+                ]
             
-            for i, page_path in enumerate(page_paths, start=1):
-                logger.info(f"Processing page {i}/{len(page_paths)}...")
-                
-                # Preprocess page
-                processed_path = page_path.replace('.jpg', '_processed.jpg')
-                self.preprocessor.preprocess(page_path, processed_path)
-                
-                # Choose OCR engine based on handwriting mode
-                if use_trocr_for_this_job:
-                    # Use TrOCR for handwritten text
-                    if self.trocr_engine is None:
-                        logger.info("Lazy-loading TrOCR engine...")
-                        self.trocr_engine = TrOCREngine()
-                    
-                    text, confidence, _ = self.trocr_engine.extract_text(processed_path)
-                    logger.info(f"Page {i} TrOCR completed. Confidence: {confidence}%")
-                else:
-                    # Use regular Tesseract OCR
-                    text, confidence, _ = self.ocr_engine.extract_text(processed_path)
-                    logger.info(f"Page {i} Tesseract OCR completed. Confidence: {confidence}%")
-                    
-                all_text.append(text)
-                total_confidence += confidence
+            loop = asyncio.get_running_loop()
+            if use_trocr_for_this_job:
+                if self.trocr_engine is None:
+                    self.trocr_engine = get_trocr_engine()
                 
-                logger.info(f"Page {i} OCR completed. Confidence: {confidence}%")
+                # Every page is rendered in handwriting mode; preprocess them
+                # concurrently, then run TrOCR once over all of them
+                processed_pages = await asyncio.gather(*[
+                    loop.run_in_executor(_page_executor, self._preprocess_page, i, image, debug_dir)
+                    for i, (image, _) in enumerate(pages)
+                ])
+                trocr_results = await asyncio.to_thread(self.trocr_engine.extract_text_batch, processed_pages)
+                all_text = [text for text, _, _ in trocr_results]
+                confidences = [confidence for _, confidence, _ in trocr_results]
+                logger.info(f"TrOCR completed for {len(pages)} pages")
+            else:
+                # Process pages concurrently; gather keeps results in page order
+                page_results = await asyncio.gather(*[
+                    loop.run_in_executor(
+                        _page_executor, self._process_single_page,
+                        i, image, debug_dir, embedded_text
+                    )
+                    for i, (image, embedded_text) in enumerate(pages)
+                ])
+                all_text = [text for text, _ in page_results]
+                confidences = [confidence for _, confidence in page_results]
             
             # Combine all text
             combined_text = '\n\n--- PAGE BREAK ---\n\n'.join(all_text)
-            avg_confidence = total_confidence / len(page_paths)
+            avg_confidence = sum(confidences) / len(pages)
             
             # Parse all answers from combined text
             answers = self.parser.parse(combined_text, total_marks)
@@ -156,7 +304,7 @@ class MultiPageProcessor:
             logger.info(f"Multi-page processing complete. Found {len(answers)} questions")
             
             return {
-                'total_pages': len(page_paths),
+                'total_pages': len(pages),
                 'combined_text': combined_text,
                 'average_confidence': round(avg_confidence, 2),
                 'answers': answers,
@@ -1,16 +1,39 @@
 """
 Notification service for email and other delivery methods.
 """
-import smtplib
+import asyncio
+import base64
+import mmap
+import os
+import aiosmtplib
+from email.mime.base import MIMEBase
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
-from email.mime.application import MIMEApplication
 from typing import List, Optional
+from jinja2 import Environment
 from app.config.logging_config import get_logger
 from app.config.settings import settings
 
 logger = get_logger(__name__)
 
+# Report email body, compiled once at import; autoescape keeps names from injecting HTML
+REPORT_EMAIL_TEMPLATE = Environment(autoescape=True).from_string("""
+        <html>
+        <body>
+            <h2>Dear {{ student_name }},</h2>
+            <p>Your test has been assessed. Here are your results:</p>
+            <ul>
+                <li><strong>Grade:</strong> {{ grade }}</li>
+                <li><strong>Score:</strong> {{ "%.2f"|format(percentage) }}%</li>
+            </ul>
+            <p>Please find your detailed assessment report attached.</p>
+            <p>Keep up the good work!</p>
+            <br>
+            <p>Best regards,<br>Agentic AI Assessment System</p>
+        </body>
+        </html>
+        """)
+
 
 class NotificationService:
     """Service for sending notifications via email."""
@@ -21,8 +44,66 @@ class NotificationService:
         self.smtp_port = settings.smtp_port
         self.smtp_user = settings.smtp_user
         self.smtp_password = settings.smtp_password
+        
+        # Persistent SMTP connection, shared by all sends and guarded by a lock
+        self._smtp: Optional[aiosmtplib.SMTP] = None
+        self._smtp_lock = asyncio.Lock()
         logger.info("NotificationService initialized")
     
+    async def _get_smtp(self) -> aiosmtplib.SMTP:
+        """
+        Return a connected, authenticated SMTP client, reconnecting if needed.
+        Must be called with the SMTP lock held.
+        
+        Returns:
+            Connected SMTP client
+        """
+        if self._smtp is not None and self._smtp.is_connected:
+            try:
+                await self._smtp.noop()
+                return self._smtp
+            except aiosmtplib.SMTPException:
+                logger.info("SMTP connection went stale, reconnecting")
+                self._smtp.close()
+        
+        smtp = aiosmtplib.SMTP(
+            hostname=self.smtp_host,
+            port=self.smtp_port,
+            start_tls=True
+        )
+        await smtp.connect()
+        await smtp.login(self.smtp_user, self.smtp_password)
+        self._smtp = smtp
+        logger.info("SMTP connection established")
+        return smtp
+    
+    async def _send_message(self, msg: MIMEMultipart) -> None:
+        """
+        Send a message over the shared SMTP connection, retrying once on disconnect.
+        
+        Args:
+            msg: Message to send
+        """
+        async with self._smtp_lock:
+            smtp = await self._get_smtp()
+            try:
+                await smtp.send_message(msg)
+            except aiosmtplib.SMTPServerDisconnected:
+                logger.warning("SMTP server disconnected, retrying once")
+                self._smtp = None
+                smtp = await self._get_smtp()
+                await smtp.send_message(msg)
+    
+    async def close(self) -> None:
+        """Close the shared SMTP connection."""
+        async with self._smtp_lock:
+            if self._smtp is not None and self._smtp.is_connected:
+                try:
+                    await self._smtp.quit()
+                except aiosmtplib.SMTPException:
+                    self._smtp.close()
+            self._smtp = None
+    
     async def send_email(
         self,
         to_email: str,
@@ -58,23 +139,17 @@ class NotificationService:
             # Add body
             msg.attach(MIMEText(body, 'html'))
             
-            # Add attachments if provided
+            # Add attachments if provided (files are encoded concurrently)
             if attachments:
-                for file_path in attachments:
-                    try:
-                        with open(file_path, 'rb') as f:
-                            attachment = MIMEApplication(f.read())
-                            attachment.add_header('Content-Disposition', 'attachment',
-                                                filename=file_path.split('/')[-1])
-                            msg.attach(attachment)
-                    except Exception as e:
-                        logger.error(f"Failed to attach file {file_path}: {str(e)}")
+                parts = await asyncio.gather(
+                    *(asyncio.to_thread(self._build_attachment, file_path) for file_path in attachments)
+                )
+                for part in parts:
+                    if part is not None:
+                        msg.attach(part)
             
             # Send email
-            with smtplib.SMTP(self.smtp_host, self.smtp_port) as server:
-                server.starttls()
-                server.login(self.smtp_user, self.smtp_password)
-                server.send_message(msg)
+            await self._send_message(msg)
             
             logger.info(f"Email sent successfully to: {to_email}")
             return True
@@ -83,6 +158,37 @@ class NotificationService:
             logger.error(f"Email sending failed: {str(e)}", exc_info=True)
             return False
     
+    def _build_attachment(self, file_path: str) -> Optional[MIMEBase]:
+        """
+        Build a base64-encoded attachment part from a memory-mapped file.
+        
+        The file is encoded straight from the mapping, so only the encoded
+        payload is held in memory rather than a raw copy plus the encoding.
+        
+        Args:
+            file_path: Path to file
+            
+        Returns:
+            Attachment part, or None if the file could not be read
+        """
+        try:
+            with open(file_path, 'rb') as f:
+                if os.fstat(f.fileno()).st_size == 0:
+                    payload = ''
+                else:
+                    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                        payload = base64.encodebytes(mm).decode('ascii')
+            
+            attachment = MIMEBase('application', 'octet-stream')
+            attachment.set_payload(payload)
+            attachment['Content-Transfer-Encoding'] = 'base64'
+            attachment.add_header('Content-Disposition', 'attachment',
+                                filename=os.path.basename(file_path))
+            return attachment
+        except Exception as e:
+            logger.error(f"Failed to attach file {file_path}: {str(e)}")
+            return None
+    
     async def send_report_email(
         self,
         student_name: str,
@@ -106,22 +212,11 @@ class NotificationService:
         """
         subject = f"Your Test Assessment Report - Grade: {grade}"
         
-        body = f"""
-        <html>
-        <body>
-            <h2>Dear {student_name},</h2>
-            <p>Your test has been assessed. Here are your results:</p>
-            <ul>
-                <li><strong>Grade:</strong> {grade}</li>
-                <li><strong>Score:</strong> {percentage:.2f}%</li>
-            </ul>
-            <p>Please find your detailed assessment report attached.</p>
-            <p>Keep up the good work!</p>
-            <br>
-            <p>Best regards,<br>Agentic AI Assessment System</p>
-        </body>
-        </html>
-        """
+        body = REPORT_EMAIL_TEMPLATE.render(
+            student_name=student_name,
+            grade=grade,
+            percentage=percentage
+        )
         
         return await self.send_email(
             to_email=student_email,
@@ -1,28 +1,48 @@
 """
 PDF service for advanced PDF operations.
 """
+import asyncio
+import io
 import os
-from typing import List
-from PyPDF2 import PdfMerger, PdfReader
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+from typing import BinaryIO, List, Optional, Tuple, Union
+import pikepdf
 from app.config.logging_config import get_logger
+from app.services.io_pipeline import AsyncIOPipeline
 
 logger = get_logger(__name__)
 
+# Upper bound on input PDFs parsed concurrently during a merge
+MAX_PDF_PARSE_WORKERS = 8
+
+# Number of get_pdf_info results kept in memory
+PDF_INFO_CACHE_SIZE = 256
+
 
 class PDFService:
     """Service for PDF manipulation operations."""
     
     def __init__(self):
         """Initialize PDF service."""
+        # LRU of get_pdf_info results keyed by (path, mtime_ns, size); the service is shared
+        self._info_cache: "OrderedDict[Tuple[str, int, int], dict]" = OrderedDict()
+        self._info_cache_lock = threading.Lock()
         logger.info("PDFService initialized")
     
-    def merge_pdfs(self, pdf_files: List[str], output_path: str) -> str:
+    def merge_pdfs(self, pdf_files: List[str], output_path: str, optimize_size: bool = False) -> str:
         """
         Merge multiple PDF files into one.
         
+        Inputs are parsed in parallel, then their pages are appended in order
+        by qpdf (via pikepdf) without re-parsing them in Python.
+        
         Args:
             pdf_files: List of PDF file paths
             output_path: Output path for merged PDF
+            optimize_size: Recompress streams for a smaller output file
             
         Returns:
             Path to merged PDF
@@ -33,16 +53,7 @@ class PDFService:
         try:
             logger.info(f"Merging {len(pdf_files)} PDFs")
             
-            merger = PdfMerger()
-            
-            for pdf_file in pdf_files:
-                if os.path.exists(pdf_file):
-                    merger.append(pdf_file)
-                else:
-                    logger.warning(f"PDF file not found: {pdf_file}")
-            
-            merger.write(output_path)
-            merger.close()
+            self._merge_into(pdf_files, output_path, optimize_size)
             
             logger.info(f"PDFs merged successfully: {output_path}")
             return output_path
@@ -51,10 +62,98 @@ class PDFService:
             logger.error(f"PDF merge failed: {str(e)}", exc_info=True)
             raise Exception(f"PDF merge failed: {str(e)}")
     
+    async def merge_pdfs_async(
+        self,
+        pdf_files: List[str],
+        output_path: str,
+        pipeline: AsyncIOPipeline,
+        optimize_size: bool = False,
+        job_id: Optional[str] = None
+    ) -> asyncio.Future:
+        """
+        Merge PDFs in a worker thread and hand the result to the write pipeline.
+        
+        Returns as soon as the merged document is queued, so the caller can
+        start its next job while the file is being written.
+        
+        Args:
+            pdf_files: List of PDF file paths
+            output_path: Output path for merged PDF
+            pipeline: Write pipeline that persists the merged PDF
+            optimize_size: Recompress streams for a smaller output file
+            job_id: Optional job identifier the merged PDF is recorded against
+            
+        Returns:
+            Future resolving to the number of bytes written
+            
+        Raises:
+            Exception: If merge fails
+        """
+        try:
+            logger.info(f"Merging {len(pdf_files)} PDFs for pipelined write to {output_path}")
+            buffer = io.BytesIO()
+            await asyncio.to_thread(self._merge_into, pdf_files, buffer, optimize_size)
+            # Hand over a view of the buffer rather than a second copy of the PDF
+            return await pipeline.submit(output_path, buffer.getbuffer(), job_id)
+            
+        except Exception as e:
+            logger.error(f"PDF merge failed: {str(e)}", exc_info=True)
+            raise Exception(f"PDF merge failed: {str(e)}")
+    
+    def _merge_into(
+        self,
+        pdf_files: List[str],
+        target: Union[str, BinaryIO],
+        optimize_size: bool
+    ) -> None:
+        """
+        Merge PDF files and save the result to a path or writable stream.
+        
+        Args:
+            pdf_files: List of PDF file paths
+            target: Output path or binary stream
+            optimize_size: Recompress streams for a smaller output file
+        """
+        existing_files = []
+        for pdf_file in pdf_files:
+            if os.path.exists(pdf_file):
+                existing_files.append(pdf_file)
+            else:
+                logger.warning(f"PDF file not found: {pdf_file}")
+        
+        # Sources stay open until save, since stream data is copied lazily
+        with pikepdf.Pdf.new() as merged, ExitStack() as sources:
+            max_workers = max(1, min(MAX_PDF_PARSE_WORKERS, len(existing_files)))
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                futures = [executor.submit(pikepdf.open, pdf_file) for pdf_file in existing_files]
+            
+            # Register every opened source before surfacing a parse error
+            parsed, errors = [], []
+            for future in futures:
+                try:
+                    parsed.append(sources.enter_context(future.result()))
+                except Exception as e:
+                    errors.append(e)
+            if errors:
+                raise errors[0]
+            
+            # Appends must stay in input order
+            for src in parsed:
+                merged.pages.extend(src.pages)
+            
+            merged.save(
+                target,
+                linearize=False,
+                object_stream_mode=pikepdf.ObjectStreamMode.generate,
+                recompress_flate=optimize_size
+            )
+    
     def get_pdf_info(self, pdf_path: str) -> dict:
         """
         Get information about a PDF file.
         
+        Results are cached until the file's modification time or size changes.
+        
         Args:
             pdf_path: Path to PDF file
             
@@ -62,14 +161,32 @@ class PDFService:
             Dictionary with PDF information
         """
         try:
-            reader = PdfReader(pdf_path)
-            info = {
-                'num_pages': len(reader.pages),
-                'metadata': reader.metadata,
-                'file_size': os.path.getsize(pdf_path)
-            }
+            st = os.stat(pdf_path)
+            key = (pdf_path, st.st_mtime_ns, st.st_size)
+            with self._info_cache_lock:
+                cached = self._info_cache.get(key)
+                if cached is not None:
+                    self._info_cache.move_to_end(key)
+                    return dict(cached)
+            
+            # Memory-mapped open reads the xref and page tree without decoding content streams
+            with pikepdf.open(pdf_path, access_mode=pikepdf.AccessMode.mmap) as pdf:
+                info = {
+                    'num_pages': len(pdf.pages),
+                    'metadata': {str(key): str(value) for key, value in pdf.docinfo.items()},
+                    'file_size': st.st_size
+                }
             logger.debug(f"PDF info retrieved: {pdf_path}")
-            return info
+            
+            with self._info_cache_lock:
+                self._info_cache[key] = info
+                self._info_cache.move_to_end(key)
+                if len(self._info_cache) > PDF_INFO_CACHE_SIZE:
+                    self._info_cache.popitem(last=False)
+            return dict(info)
+        except pikepdf.PdfError as e:
+            logger.error(f"Failed to parse PDF {pdf_path}: {str(e)}")
+            return {}
         except Exception as e:
             logger.error(f"Failed to get PDF info: {str(e)}")
             return {}
\ No newline at end of file
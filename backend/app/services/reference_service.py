@@ -1,9 +1,10 @@
 """
 Reference document management service.
 """
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, AsyncIterator
 from motor.motor_asyncio import AsyncIOMotorCollection
 from app.config.logging_config import get_logger
+from app.core.utils import retry_async
 from app.services.database_service import DatabaseService
 
 logger = get_logger(__name__)
@@ -18,6 +19,21 @@ class ReferenceService:
         self.collection: AsyncIOMotorCollection = db.db['references']
         logger.info("ReferenceService initialized")
     
+    async def ensure_indexes(self) -> None:
+        """Create the indexes used by reference lookups and listings."""
+        try:
+            await self.collection.create_index("reference_id", unique=True)
+            
+            # Listing filters on active references, newest first; inactive ones stay out of the index
+            await self.collection.create_index(
+                [("is_active", 1), ("subject", 1), ("exam_name", 1), ("created_at", -1)],
+                partialFilterExpression={"is_active": True}
+            )
+            logger.info("Reference indexes created")
+        except Exception as e:
+            logger.error(f"Reference index creation failed: {str(e)}", exc_info=True)
+            raise Exception(f"Reference index creation failed: {str(e)}")
+    
     async def create_reference(self, reference_data: Dict[str, Any]) -> Dict[str, Any]:
         """
         Create a new reference document.
@@ -30,6 +46,8 @@ class ReferenceService:
         """
         try:
             logger.info(f"Creating reference: {reference_data['reference_id']}")
+            # Not wrapped in retry_async: a re-sent insert would hit the unique
+            # reference_id index, so retries are left to the driver's retryable writes
             await self.collection.insert_one(reference_data)
             logger.info(f"Reference created: {reference_data['reference_id']}")
             return reference_data
@@ -37,6 +55,28 @@ class ReferenceService:
             logger.error(f"Reference creation failed: {str(e)}", exc_info=True)
             raise Exception(f"Reference creation failed: {str(e)}")
     
+    async def create_references(self, references: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Create multiple reference documents in a single round-trip.
+        
+        Args:
+            references: List of reference data dictionaries
+            
+        Returns:
+            Created reference data
+        """
+        if not references:
+            return []
+        
+        try:
+            logger.info(f"Creating {len(references)} references in bulk")
+            await self.collection.insert_many(references, ordered=False)
+            logger.info(f"Bulk reference creation completed: {len(references)} references")
+            return references
+        except Exception as e:
+            logger.error(f"Bulk reference creation failed: {str(e)}", exc_info=True)
+            raise Exception(f"Bulk reference creation failed: {str(e)}")
+    
     async def get_reference(self, reference_id: str) -> Optional[Dict[str, Any]]:
         """
         Retrieve reference by ID.
@@ -83,7 +123,8 @@ class ReferenceService:
             updates['updated_at'] = datetime.utcnow()
             
             logger.info(f"Updating reference: {reference_id}")
-            result = await self.collection.find_one_and_update(
+            result = await retry_async(
+                self.collection.find_one_and_update,
                 {"reference_id": reference_id},
                 {"$set": updates},
                 return_document=ReturnDocument.AFTER,
@@ -100,6 +141,42 @@ class ReferenceService:
             logger.error(f"Reference update failed: {str(e)}", exc_info=True)
             raise Exception(f"Reference update failed: {str(e)}")
     
+    async def iter_references(
+        self,
+        subject: Optional[str] = None,
+        exam_name: Optional[str] = None,
+        active_only: bool = True,
+        limit: int = 0
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Stream references with optional filters, newest first.
+        
+        Args:
+            subject: Filter by subject
+            exam_name: Filter by exam name
+            active_only: Only return active references
+            limit: Maximum number of references (0 for no limit)
+            
+        Yields:
+            Reference documents
+        """
+        query = {}
+        if active_only:
+            query['is_active'] = True
+        if subject:
+            query['subject'] = subject
+        if exam_name:
+            query['exam_name'] = exam_name
+        
+        cursor = (
+            self.collection.find(query, {"_id": 0})
+            .sort("created_at", -1)
+            .limit(limit)
+            .batch_size(50)
+        )
+        async for reference in cursor:
+            yield reference
+    
     async def list_references(
         self,
         subject: Optional[str] = None,
@@ -115,19 +192,13 @@ class ReferenceService:
             active_only: Only return active references
             
         Returns:
-            List of references
+            List of up to 100 references
         """
         try:
-            query = {}
-            if active_only:
-                query['is_active'] = True
-            if subject:
-                query['subject'] = subject
-            if exam_name:
-                query['exam_name'] = exam_name
-            
-            cursor = self.collection.find(query, {"_id": 0}).sort("created_at", -1)
-            references = await cursor.to_list(length=100)
+            references = [
+                reference async for reference in
+                self.iter_references(subject, exam_name, active_only, limit=100)
+            ]
             
             logger.debug(f"Retrieved {len(references)} references")
             return references
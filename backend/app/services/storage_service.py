@@ -1,17 +1,71 @@
 """
 File storage service for handling uploads and downloads.
 """
+import asyncio
 import os
-import aiofiles
 import shutil
-from typing import Optional
+from typing import BinaryIO, Optional, Union
 from fastapi import UploadFile
 from app.config.logging_config import get_logger
 from app.config.settings import settings
-from app.core.utils import ensure_directory_exists, sanitize_filename
+from app.core.utils import ensure_directory_exists, retry_async
 
 logger = get_logger(__name__)
 
+# Uploads are streamed to disk in chunks of this size
+UPLOAD_CHUNK_SIZE = 1 << 20  # 1 MiB
+
+
+def _sync_write(path: str, source: BinaryIO) -> int:
+    """
+    Copy a file object to disk in chunks with blocking I/O.
+    
+    Args:
+        path: Destination file path
+        source: Readable binary file object
+        
+    Returns:
+        Number of bytes written
+    """
+    with open(path, 'wb') as f:
+        shutil.copyfileobj(source, f, UPLOAD_CHUNK_SIZE)
+        return f.tell()
+
+
+def _sync_write_bytes(path: str, data: Union[bytes, memoryview]) -> int:
+    """
+    Write a bytes buffer to disk with blocking I/O.
+    
+    Args:
+        path: Destination file path
+        data: File contents
+    
+    Returns:
+        Number of bytes written
+    """
+    with open(path, 'wb') as f:
+        return f.write(data)
+
+
+def _remove_path(path: str) -> bool:
+    """
+    Delete a file or directory tree, ignoring paths that are already gone.
+    
+    Args:
+        path: File or directory path
+    
+    Returns:
+        True if something was deleted, False otherwise
+    """
+    try:
+        if os.path.isdir(path) and not os.path.islink(path):
+            shutil.rmtree(path)
+        else:
+            os.unlink(path)
+        return True
+    except FileNotFoundError:
+        return False
+
 
 class StorageService:
     """Handles file storage operations."""
@@ -19,6 +73,10 @@ class StorageService:
     def __init__(self):
         """Initialize storage service."""
         self.upload_dir = settings.upload_dir
+        # Lower-cased ".ext" suffixes that may be kept on stored uploads
+        self.allowed_suffixes = frozenset(
+            f".{ext.lower()}" for ext in settings.allowed_extensions_list
+        )
         ensure_directory_exists(self.upload_dir)
         logger.info(f"StorageService initialized. Upload directory: {self.upload_dir}")
     
@@ -43,9 +101,12 @@ class StorageService:
             Exception: If save operation fails
         """
         try:
-            # Sanitize filename
-            original_filename = sanitize_filename(file.filename)
-            file_extension = os.path.splitext(original_filename)[1]
+            # Only the extension of the client filename is kept, and only if allowed
+            name = file.filename or ''
+            dot = name.rfind('.')
+            file_extension = name[dot:] if dot >= 0 else ''
+            if file_extension.lower() not in self.allowed_suffixes:
+                file_extension = ''
             
             # Create new filename
             new_filename = f"{job_id}_{prefix}{file_extension}"
@@ -53,11 +114,8 @@ class StorageService:
             
             logger.info(f"Saving uploaded file: {new_filename}")
             
-            # Save file
-            async with aiofiles.open(file_path, 'wb') as f:
-                content = await file.read()
-                await f.write(content)
-                file_size = len(content)
+            # Stream file to disk in one worker thread so memory use stays flat
+            file_size = await retry_async(asyncio.to_thread, self._store_upload, job_id, file_path, file.file)
             
             logger.info(f"File saved successfully: {file_path} ({file_size} bytes)")
             return file_path, file_size
@@ -66,6 +124,94 @@ class StorageService:
             logger.error(f"Failed to save file: {str(e)}", exc_info=True)
             raise Exception(f"File save failed: {str(e)}")
     
+    async def save_bytes(self, file_path: str, data: Union[bytes, memoryview], job_id: Optional[str] = None) -> int:
+        """
+        Write in-memory file contents to storage.
+        
+        Args:
+            file_path: Destination file path
+            data: File contents
+            job_id: Optional job identifier; the file is recorded in its manifest
+        
+        Returns:
+            Number of bytes written
+        """
+        file_size = await asyncio.to_thread(self._store_bytes, file_path, data, job_id)
+        logger.info(f"File saved successfully: {file_path} ({file_size} bytes)")
+        return file_size
+    
+    def _store_upload(self, job_id: str, file_path: str, source: BinaryIO) -> int:
+        """
+        Write an upload to disk and record it in the job manifest.
+        
+        Args:
+            job_id: Job identifier
+            file_path: Destination file path
+            source: Readable binary file object
+            
+        Returns:
+            Number of bytes written
+        """
+        # Rewind so a retried attempt copies the upload from the start
+        source.seek(0)
+        file_size = _sync_write(file_path, source)
+        self._add_to_manifest(job_id, file_path)
+        return file_size
+    
+    def _store_bytes(self, file_path: str, data: Union[bytes, memoryview], job_id: Optional[str]) -> int:
+        """
+        Write a bytes buffer to disk and record it in the job manifest.
+        
+        Args:
+            file_path: Destination file path
+            data: File contents
+            job_id: Optional job identifier
+            
+        Returns:
+            Number of bytes written
+        """
+        file_size = _sync_write_bytes(file_path, data)
+        if job_id:
+            self._add_to_manifest(job_id, file_path)
+        return file_size
+    
+    def _manifest_path(self, job_id: str) -> str:
+        """
+        Get the path of a job's file manifest.
+        
+        Args:
+            job_id: Job identifier
+            
+        Returns:
+            Manifest file path
+        """
+        return os.path.join(self.upload_dir, f"{job_id}.manifest")
+    
+    def _add_to_manifest(self, job_id: str, *file_paths: str) -> None:
+        """
+        Append paths to the job's manifest (one path per line).
+        
+        Args:
+            job_id: Job identifier
+            *file_paths: Paths of files or directories belonging to the job
+        """
+        with open(self._manifest_path(job_id), 'a', encoding='utf-8') as f:
+            f.write("".join(f"{file_path}\n" for file_path in file_paths))
+    
+    async def record_job_files(self, job_id: str, *file_paths: str) -> None:
+        """
+        Record outputs written outside StorageService in the job manifest.
+        
+        Call this where the file or directory is created, so cleanup can
+        delete it without scanning the upload directory.
+        
+        Args:
+            job_id: Job identifier
+            *file_paths: Paths of files or directories belonging to the job
+        """
+        if file_paths:
+            await asyncio.to_thread(self._add_to_manifest, job_id, *file_paths)
+    
     def get_file_path(self, job_id: str, prefix: str, extension: str) -> str:
         """
         Get file path for a specific job and prefix.
@@ -119,23 +265,35 @@ class StorageService:
         """
         Delete all files associated with a job.
         
+        Every job output is recorded in the job manifest when it is
+        written, so only those paths are touched. Jobs created before
+        manifests existed fall back to scanning the upload directory.
+        
         Args:
             job_id: Job identifier
             
         Returns:
-            Number of files deleted
+            Number of files and directories deleted
         """
         try:
-            deleted_count = 0
-            for filename in os.listdir(self.upload_dir):
-                if filename.startswith(job_id):
-                    file_path = os.path.join(self.upload_dir, filename)
-                    if self.delete_file(file_path):
-                        deleted_count += 1
+            manifest_path = self._manifest_path(job_id)
+            
+            try:
+                with open(manifest_path, 'r', encoding='utf-8') as f:
+                    file_paths = set(f.read().splitlines())
+            except FileNotFoundError:
+                file_paths = None
+            
+            if file_paths is None:
+                with os.scandir(self.upload_dir) as entries:
+                    file_paths = {entry.path for entry in entries if entry.name.startswith(job_id)}
+            
+            deleted_count = sum(_remove_path(file_path) for file_path in file_paths)
+            _remove_path(manifest_path)
             
             logger.info(f"Cleaned up {deleted_count} files for job {job_id}")
             return deleted_count
             
         except Exception as e:
             logger.error(f"Cleanup failed for job {job_id}: {str(e)}")
-            return 0
\ No newline at end of file
+            return 0